@@ -6,8 +6,8 @@ import sys
 import argparse
 import os
 
-# Increase recursion limit for parsing larger programs
-# Default is 1000, which is insufficient for programs with many statements
+# Increase recursion limit for compiling larger programs
+# Default is 1000, which is insufficient for generating code for deeply nested blocks
 sys.setrecursionlimit(5000)
 
 def tokenize_from_file(filepath: str):
@@ -67,6 +67,34 @@ def tokenize_from_string(source_code: str):
         print(f"Unexpected error: {e}")
         return None
 
+def check(filepath: str):
+    """
+    Run the front end (lexer, parser and semantic analysis) on a source file.
+    
+    Args:
+        filepath: Path to the source code file
+    
+    Returns:
+        The AST if the program is semantically valid, otherwise None
+    """
+    toks = tokenize_from_file(filepath)
+    
+    if toks is None:
+        return None
+    
+    # Parse the tokens into an AST
+    tree = parse(toks)
+    
+    # Check semantics
+    semantics_valid = check_semantics(tree)
+    print(f"Semantic analysis: {semantics_valid}")
+    
+    if not semantics_valid:
+        print("Error: Semantic analysis failed!")
+        return None
+    
+    return tree
+
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(
@@ -92,20 +120,9 @@ Examples:
         filepath = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'test', 'test_basic.txt'))
         print(f"Using default test file: {filepath}")
 
-    toks = tokenize_from_file(filepath)
-    
-    if toks is None:
-        return
-    
-    # Parse the tokens into an AST
-    tree = parse(toks)
+    tree = check(filepath)
     
-    # Check semantics
-    semantics_valid = check_semantics(tree)
-    print(f"Semantic analysis: {semantics_valid}")
-    
-    if not semantics_valid:
-        print("Error: Semantic analysis failed!")
+    if tree is None:
         return
     
     # Generate assembly code with target emulator
@@ -119,6 +136,7 @@ Examples:
         f.write(asm_code)
     
     print(f"Assembly code written to: {output_file}")
+    
     print("\n" + "="*60)
     print(asm_code)
     print("="*60)
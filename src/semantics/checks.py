@@ -1,94 +1,129 @@
 from shared.tree import Tree
-from shared.grammer import Symbol
-from shared.tok import TokenType, Token
+from shared.tok import TokenType
 from syntax.grammer_def import N
 from math import inf
 
+# Starting point for the lowest (brace depth, precedence) search, above every real operator key
+_INF_KEY = (inf, inf)
+
+'''
+    Checks that the identifier [node] is declared before it is used.
+'''
+def _check_id_declared(node: Tree, declared_symbols: set[int]) -> bool:
+    if node.symbol.name_id not in declared_symbols:
+        print("Identifier used before being declared:", node.symbol)
+        return False
+    return True
+
+'''
+    Checks that a STATEMENT [node] which declares a variable doesn't declare it more than once,
+    and records the declared identifier.
+'''
+def _check_statement_decl(node: Tree, declared_symbols: set[int]) -> bool:
+    children = node.nodes
+    if len(children) > 1 and children[0].symbol.type == TokenType.VAR:
+        name = children[1].symbol
+        if name.name_id in declared_symbols:
+            print("Identifier is already declared:", name)
+            return False
+        declared_symbols.add(name.name_id)
+    return True
+
+# Semantic rules, keyed by the symbol type they apply to
+_SEM_HANDLERS = {
+    TokenType.ID: _check_id_declared,
+    N.STATEMENT: _check_statement_decl,
+}
+
 '''
     Checks [node] against all semantic rules. Returns True/False if success/fail.
 '''
-def _sem(node: Tree, declared_symbols: dict[Symbol]) -> bool:
+def _sem(node: Tree, declared_symbols: set[int]) -> bool:
     # Handle None nodes (used for operator positions in AST)
     if node is None:
         return True
-    
-    node_symbol = node.symbol
-    children = node.nodes
-
-    # Check if identifier is declared before using it
-    if node_symbol.type == TokenType.ID:
-        if not node_symbol in declared_symbols:
-            print("Identifier used before being declared:", node_symbol)
-            return False
 
-    if node_symbol.type == N.STATEMENT:
-        # Check if identifier is being declared more than once
-        if children and children[0].symbol.type == TokenType.VAR:
-            if len(children) > 1 and children[1].symbol in declared_symbols:
-                print("Identifier is already declared:", children[1].symbol)
-                return False
-            elif len(children) > 1:
-                declared_symbols[children[1].symbol] = True
-    return True
+    handler = _SEM_HANDLERS.get(node.symbol.type)
+    return True if handler is None else handler(node, declared_symbols)
 
 '''
     Restructures a [node]'s children to convert it into an abstract syntax tree.
     Moves operator nodes with the lowest precedence upward, making them the parent node of their binary expression.
 '''
-def _build_ast(node: Tree, precedence_offset: int):
-    # Offsets precedence if under brackets
-    # Recognize unary minus, increase it's precedence from 5 to 6
-    if node.symbol.type == N.P6 and node.nodes[0].symbol.type == TokenType.MINUS:
-        node.nodes[0].symbol.precedence += 1
-    if isinstance(node.symbol, Token) and node.symbol.precedence is not None:
-        node.symbol.precedence += precedence_offset
-
+def _build_ast(node: Tree, brace_depth: int):
+    # Recognize unary minus, it binds tighter than binary minus (6 instead of 5)
     children = node.nodes
+    if node.symbol.type == N.P6 and children[0].symbol.type == TokenType.MINUS:
+        children[0].precedence = children[0].symbol.type.precedence + 1
+    # Operators under brackets bind tighter than any operator outside of them
+    if node.precedence >= 0:
+        node.brace_depth = brace_depth
+
+    open_brace = TokenType.OPEN_BRACE
+    close_brace = TokenType.CLOSE_BRACE
     for i in range(len(children)):
         grandchildren = children[i].nodes
 
         if not grandchildren:
             continue
 
-        # Find operator with lowest precedence within a nodes children
-        lowest_precedence = inf
+        # Find operator with lowest (brace depth, precedence) within a nodes children
+        lowest = _INF_KEY
         operator = None
         for gchild in grandchildren:
-            if isinstance(gchild.symbol, Token) and gchild.symbol.precedence is not None:
-                precedence = gchild.symbol.precedence
-                if lowest_precedence > precedence:
-                    lowest_precedence = precedence
+            if gchild.precedence >= 0:
+                key = (gchild.brace_depth, gchild.precedence)
+                if key < lowest:
+                    lowest = key
                     operator = gchild
 
         # Pushes the operator to its parent node, conserves original parent's children and positioning (left/right) of children
         # Also removes braces
         if operator is not None:
-            j = 0
-            for gchild in grandchildren:
-                if gchild.symbol.type == TokenType.OPEN_BRACE or gchild.symbol.type == TokenType.CLOSE_BRACE:
-                    continue
-
-                val = gchild if gchild != operator else None
-
-                if len(operator.nodes) == j:
-                    operator.nodes.append(val)
-                elif operator.nodes[j] is None:
-                    operator.nodes[j] = val
-                j += 1
+            operands = operator.nodes
+            if not operands:
+                # A fresh operator token takes the remaining grandchildren as they are, built in one pass
+                operands = [gchild if gchild is not operator else None for gchild in grandchildren
+                            if gchild.symbol.type != open_brace and gchild.symbol.type != close_brace]
+                operator.nodes = operands
+            else:
+                # An operator that already has operands only fills in its empty positions
+                j = 0
+                for gchild in grandchildren:
+                    gchild_type = gchild.symbol.type
+                    if gchild_type == open_brace or gchild_type == close_brace:
+                        continue
+
+                    if j == len(operands):
+                        operands.append(gchild if gchild is not operator else None)
+                    elif operands[j] is None:
+                        operands[j] = gchild if gchild is not operator else None
+                    j += 1
+
+            # Rotate while building, so equal precedence chains come out left associative in this same pass
+            if len(operands) >= 2 and operands[0] is not None and operands[1] is not None:
+                operator = _left_rotations(operator)
             children[i] = operator
 
 '''
-    Recursivly performs left rotations on a [root] nodes child [op1]
-    while [op1] has an operator child to it's right, whith equal precedence.
+    Left-rotates a freshly completed binary [op1] whose right operand is an operator of equal precedence.
+    The right operand was completed earlier in the same pass, so its equal-precedence left spine is already
+    left associative; [op1] is grafted beneath the bottom of that spine. Returns the new subtree root.
 '''
-def _left_rotations(root: Tree, op1: Tree, op1_idx: int):
-    if len(op1.nodes) < 2:
-        return
-    
-    op2 = op1.nodes[1]
-    if isinstance(op1.symbol, Token) and isinstance(op2.symbol, Token) and op1.symbol.precedence == op2.symbol.precedence:
-        temp = op2
-        op1.nodes[1] = op2.nodes[0]
-        temp.nodes[0] = op1
-        root.nodes[op1_idx] = temp
-        _left_rotations(root, temp, op1_idx)
\ No newline at end of file
+def _left_rotations(op1: Tree) -> Tree:
+    operands = op1.nodes
+    op2 = operands[1]
+    precedence = op1.precedence
+    brace_depth = op1.brace_depth
+    if not (precedence == op2.precedence >= 0 and brace_depth == op2.brace_depth):
+        return op1
+
+    spine = op2
+    left = spine.nodes[0]
+    while left is not None and left.precedence == precedence and left.brace_depth == brace_depth:
+        spine = left
+        left = spine.nodes[0]
+
+    operands[1] = left
+    spine.nodes[0] = op1
+    return op2
@@ -1,15 +1,16 @@
 from shared.tree import Tree
-from shared.tok import Token, TokenType
+from shared.tok import intern_name
 from semantics.traversal import _pre_order
 
+__all__ = ["check_semantics"]
+
+# input and output are system functions, so they are always declared
+_BUILTIN_SYMBOLS = frozenset((intern_name("input"), intern_name("output")))
+
 '''
     Checks whether a given [parse_tree] follows all semantic rules, and converts it into an AST.
     Returns True if it does, False if it doesn't
 '''
 def check_semantics(parse_tree: Tree) -> bool:
-    declared_symbols = {
-        Token(TokenType.ID, "input"): True,
-        Token(TokenType.ID, "output"): True
-    } # input and output are system functions, so they are always declared
-
+    declared_symbols = set(_BUILTIN_SYMBOLS)
     return _pre_order(parse_tree, declared_symbols, 0)
\ No newline at end of file
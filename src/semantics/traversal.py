@@ -1,70 +1,106 @@
 from shared.tok import TokenType
 from shared.tree import Tree
-from shared.grammer import Symbol
 from syntax.grammer_def import N
 
-from semantics.checks import _sem, _left_rotations, _build_ast
+from semantics.checks import _sem, _build_ast
+
+# Work item tags for the explicit traversal stacks
+_ENTER = 0
+_EXIT = 1
+_CHILD = 2
 
 '''
-    These functions recursivly traverse the [node] of a parse tree.
+    These functions traverse the [node] of a parse tree, using an explicit stack instead of recursion.
     During pre-order traversal, it's checks if [node] obeys all semantic rules.
 
     When it reaches a EXPRESSION node, it starts traversing in post-order, pushing operator nodes to the parent of two values.
-    Once it finished, it does another traversal in pre-order, performing left rotation to change right associativity to left.
+    Left rotations, which change right associativity to left, are done while the operators are pushed up.
     As a result, expressions are converted into abstract syntax trees.
+    An expression with the same shape as one that was already built and checked reuses that AST instead.
+    A reused AST is then the same object in several places of the tree. Later passes that change the tree reach it once per place,
+    so every such change has to leave a node it was already applied to as it is (the code generator's flattening and folding do).
 
     Returns True/False when the node passes/fails the semantic checks.
 '''
-def _pre_order(node: Tree, declared_symbols: dict[Symbol], precedence_offset: int) -> bool:
-    # Handle None nodes (used for operator positions in AST)
-    if node is None:
-        return True
-    
-    # Semantics check
-    if not _sem(node, declared_symbols):
-        return False
-
-    for i, child in enumerate(node.nodes):
+def _pre_order(node: Tree, declared_symbols: set[int], brace_depth: int) -> bool:
+    # (_ENTER, node, 0) checks a node, (_CHILD, parent, i) visits the i-th child of parent
+    stack = [(_ENTER, node, 0)]
+    stack_append = stack.append
+    stack_pop = stack.pop
+
+    # Finished expression ASTs, by the shape of the parse tree they were built from
+    built = {}
+
+    while stack:
+        state, node, i = stack_pop()
+
+        if state == _ENTER:
+            # Handle None nodes (used for operator positions in AST)
+            if node is None:
+                continue
+
+            # Semantics check
+            if not _sem(node, declared_symbols):
+                return False
+
+            # Children are pushed in reverse, so they are visited in source order
+            for j in range(len(node.nodes) - 1, -1, -1):
+                stack_append((_CHILD, node, j))
+            continue
+
+        # Children are read when they are reached, since earlier siblings can't change them
+        child = node.nodes[i]
+
         # If it reaches a None node (used to show if node has only a right child)
         if child is None:
             continue
 
-        # Performs rotations if two operators with equal precedence are in a "right" tree
-        _left_rotations(node, child, i)
+        # Skips subtrees no check applies to. Operators are always visited, since they gained their operands after parsing
+        if not child.needs_check and child.precedence < 0 and child.symbol.type != N.STATEMENT:
+            continue
 
-        # Traverses children
-        # If it reaches an expression node: 1) Post-order traversal to build AST 2) Pre-order traversal to perform rotations
+        # If it reaches an expression node, post-order traversal builds its AST
         if child.symbol.type == N.EXPRESSION:
-            if _post_order(child, declared_symbols, precedence_offset) is None:
-                return False
-            if not _pre_order(child, declared_symbols, precedence_offset):
-                return False
-        else:
-            if not _pre_order(child, declared_symbols, precedence_offset):
+            # An identical expression was already built and passed the checks, which only get less strict later on
+            shape = child.shape
+            if shape >= 0 and shape in built:
+                node.nodes[i] = built[shape]
+                continue
+
+            if _post_order(child, declared_symbols, brace_depth) is None:
                 return False
-            
+            if shape >= 0:
+                built[shape] = child
+        stack_append((_ENTER, child, 0))
+
     return True
 
-def _post_order(node: Tree, declared_symbols: dict[Symbol], precedence_offset: int):
-    # Traverses children
-    for child in node.nodes:
-        # Skip None nodes (used to represent operator positions in AST)
-        if child is None:
+def _post_order(node: Tree, declared_symbols: set[int], brace_depth: int):
+    stack = [(_ENTER, node)]
+    stack_append = stack.append
+    stack_pop = stack.pop
+
+    while stack:
+        state, node = stack_pop()
+
+        if state == _ENTER:
+            # Node is finished after all of its children, which are pushed in reverse to keep source order
+            stack_append((_EXIT, node))
+            for child in reversed(node.nodes):
+                # Skip None nodes (used to represent operator positions in AST)
+                if child is not None:
+                    stack_append((_ENTER, child))
             continue
-            
-        result = _post_order(child, declared_symbols, precedence_offset)
-        if result is None:
-            return None
-        else:
-            precedence_offset = result
-
-    # Increments/Decrements precedence_offset
-    if node.symbol.type == TokenType.OPEN_BRACE:
-        precedence_offset += 10
-    elif node.symbol.type == TokenType.CLOSE_BRACE:
-        precedence_offset -= 10
-
-    # Builds AST
-    _build_ast(node, precedence_offset)
-
-    return precedence_offset
\ No newline at end of file
+
+        # Tracks how many brackets the node is under
+        node_type = node.symbol.type
+        if node_type == TokenType.OPEN_BRACE:
+            brace_depth += 1
+        elif node_type == TokenType.CLOSE_BRACE:
+            brace_depth -= 1
+
+        # Builds AST, the node no longer has the shape it was parsed with
+        _build_ast(node, brace_depth)
+        node.shape = -1
+
+    return brace_depth
\ No newline at end of file
@@ -1,6 +1,420 @@
 from shared.tree import Tree
-from shared.tok import Token, TokenType as T
+from shared.tok import TokenType as T, BYTE_LITERAL_TOKENS
 from syntax.grammer_def import N
+import re
+
+# Fixed instruction sequences, built once and emitted as a whole with emit_many
+# Right operand is in A, left operand is on the stack
+_RESTORE_OPERANDS = (
+    "    STA $FE         ; Save right operand",
+    "    PLA             ; Restore left operand",
+)
+_ADD_SEQ = (*_RESTORE_OPERANDS, "    CLC", "    ADC $FE         ; Add")
+_SUB_SEQ = (*_RESTORE_OPERANDS, "    SEC", "    SBC $FE         ; Subtract")
+_AND_SEQ = (*_RESTORE_OPERANDS, "    AND $FE         ; Bitwise AND")
+_ORA_SEQ = (*_RESTORE_OPERANDS, "    ORA $FE         ; Bitwise OR")
+_EOR_SEQ = (*_RESTORE_OPERANDS, "    EOR $FE         ; Bitwise XOR")
+# The same operations with the left operand in A, and {operand} as the right operand's addressing mode
+_ADD_OPERAND_SEQ = ("    CLC", "    ADC {operand:<12}; Add")
+_SUB_OPERAND_SEQ = ("    SEC", "    SBC {operand:<12}; Subtract")
+_AND_OPERAND_SEQ = ("    AND {operand:<12}; Bitwise AND",)
+_ORA_OPERAND_SEQ = ("    ORA {operand:<12}; Bitwise OR",)
+_EOR_OPERAND_SEQ = ("    EOR {operand:<12}; Bitwise XOR",)
+
+# Operators that read their right operand from memory, so a literal or variable can be used directly instead of $FE
+_DIRECT_OPS = frozenset((
+    T.PLUS, T.MINUS, T.BIT_AND, T.BIT_OR, T.BIT_XOR,
+    T.EQUAL, T.NOT_EQUAL, T.LESS_THAN, T.LESS_THAN_EQUALS, T.GREATER_THAN, T.GREATER_THAN_EQUALS,
+    T.LOGIC_XOR,
+))
+# Operator to use when the operands are swapped (a < b is b > a)
+_SWAPPED_OPS = {
+    T.PLUS: T.PLUS,
+    T.BIT_AND: T.BIT_AND,
+    T.BIT_OR: T.BIT_OR,
+    T.BIT_XOR: T.BIT_XOR,
+    T.LOGIC_XOR: T.LOGIC_XOR,
+    T.EQUAL: T.EQUAL,
+    T.NOT_EQUAL: T.NOT_EQUAL,
+    T.LESS_THAN: T.GREATER_THAN,
+    T.LESS_THAN_EQUALS: T.GREATER_THAN_EQUALS,
+    T.GREATER_THAN: T.LESS_THAN,
+    T.GREATER_THAN_EQUALS: T.LESS_THAN_EQUALS,
+}
+
+# Fixed parts of every program, each pre-joined into one string that is emitted as a single line
+_HEADER = "\n".join((
+    # Generate comments and DASM assembler directives
+    "; Generated 6502 Assembly Code",
+    "; Processor: 6502",
+    "",
+    "    processor 6502",
+    "    org $0600    ; Start program at $0600",
+    "",
+    # The 6502 hardware stack lives at $0100-$01FF
+    # We set stack pointer to $FF so stack grows down from $01FF
+    "start:",
+    "    LDX #$FF",
+    "    TXS          ; Initialize stack pointer",
+    "",
+))
+_FOOTER = "\n".join((
+    "",
+    "    BRK          ; End program",
+    "",
+))
+_IO_HEADER = "\n".join((
+    "; ==================== I/O Routines ====================",
+    "",
+))
+# Placeholder I/O routines, see CodeGenerator._gen_generic_io
+_GENERIC_IO = "\n".join((
+    "output_routine:",
+    "    ; Output value in A to screen/console",
+    "    ; For 6502, this is system-dependent",
+    "    ; Here we write to memory-mapped I/O at $D012 (example)",
+    "    STA $D012       ; Write to output port",
+    "    RTS",
+    "",
+    "input_routine:",
+    "    ; Read input value into A",
+    "    ; For 6502, this is system-dependent",
+    "    ; Here we read from memory-mapped I/O at $D010 (example)",
+    "    LDA $D010       ; Read from input port",
+    "    RTS",
+    "",
+))
+# py65mon console I/O routines, see CodeGenerator._gen_py65mon_io
+_PY65MON_IO = "\n".join((
+    "; Target: py65mon emulator",
+    "; Console output at $F001, blocking input at $F005",
+    "",
+    "output_routine:",
+    "    ; Output value in A as decimal number (0-255)",
+    "    ; Uses zero-page $FB-$FD for temporary storage",
+    "    ; Algorithm: Repeatedly divide by 100, 10 to extract digits",
+    "    ; Suppresses leading zeros (e.g., 5 prints as '5' not '005')",
+    "    STA $FB          ; Store number to output",
+    "    LDA #1",
+    "    STA $FD          ; Start suppressing leading zeros",
+    "",
+    "    ; ===== Output hundreds digit =====",
+    "    ; Extract hundreds by repeated subtraction",
+    "    ; Example: 234 → subtract 100 twice → hundreds = 2",
+    "    LDA $FB",
+    "    LDX #0           ; X will count hundreds",
+    "output_hundreds:",
+    "    CMP #100",
+    "    BCC output_hundreds_done",
+    "    SBC #100         ; Subtract 100 (carry is set)",
+    "    INX",
+    "    JMP output_hundreds",
+    "output_hundreds_done:",
+    "    STA $FB          ; Save remainder",
+    "    TXA",
+    "    BEQ skip_hundreds ; Skip if zero (suppress leading zero)",
+    "    LDA #0",
+    "    STA $FD          ; Found non-zero, stop suppressing",
+    "    TXA",
+    "    CLC",
+    "    ADC #48          ; Convert to ASCII ('0' = 48)",
+    "    STA $F001        ; Output hundreds digit",
+    "skip_hundreds:",
+    "",
+    "    ; ===== Output tens digit =====",
+    "    ; Extract tens from remainder by repeated subtraction",
+    "    LDA $FB",
+    "    LDX #0           ; X will count tens",
+    "output_tens:",
+    "    CMP #10",
+    "    BCC output_tens_done",
+    "    SBC #10          ; Subtract 10 (carry is set)",
+    "    INX",
+    "    JMP output_tens",
+    "output_tens_done:",
+    "    STA $FB          ; Save remainder (ones digit)",
+    "    TXA",
+    "    BNE print_tens   ; Print if non-zero",
+    "    LDA $FD",
+    "    BNE skip_tens    ; Skip if still suppressing zeros",
+    "print_tens:",
+    "    LDA #0",
+    "    STA $FD          ; Stop suppressing",
+    "    TXA",
+    "    CLC",
+    "    ADC #48          ; Convert to ASCII",
+    "    STA $F001        ; Output tens digit",
+    "skip_tens:",
+    "",
+    "    ; ===== Output ones digit =====",
+    "    ; Always output ones digit, even if zero (e.g., for '0', '10', '100')",
+    "    LDA $FB",
+    "    CLC",
+    "    ADC #48          ; Convert to ASCII",
+    "    STA $F001        ; Output ones digit",
+    "",
+    "    ; Output newline for readability",
+    "    LDA #10",
+    "    STA $F001",
+    "    RTS",
+    "",
+    "input_routine:",
+    "    ; Read multi-digit number from console until Enter",
+    "    ; Reads ASCII digits and converts to binary (0-255 max)",
+    "    ; Uses zero-page $FA for accumulating result",
+    "    ; Algorithm: For each digit, multiply result by 10 and add digit",
+    "    ; Example: '123' → 0*10+1=1, 1*10+2=12, 12*10+3=123",
+    "    LDA #0",
+    "    STA $FA         ; Initialize result to 0",
+    "",
+    "input_loop:",
+    "    ; ===== Wait for next character =====",
+    "input_wait:",
+    "    LDA $F004       ; Poll for input (non-blocking)",
+    "    BEQ input_wait  ; Keep waiting if no key pressed",
+    "",
+    "    ; ===== Check for Enter key =====",
+    "    ; Enter terminates input",
+    "    CMP #10",
+    "    BEQ input_done  ; If Enter (LF), we're done",
+    "    CMP #13",
+    "    BEQ input_done  ; If Enter (CR), we're done",
+    "",
+    "    ; ===== Convert ASCII digit to number =====",
+    "    ; ASCII '0'-'9' are 48-57, so subtract 48",
+    "    SEC",
+    "    SBC #48",
+    "    STA $FE         ; Store new digit in $FE",
+    "",
+    "    ; ===== Multiply current result by 10 =====",
+    "    ; Uses bit shifts: result * 10 = (result * 2 * 5) = (result << 1) * 5",
+    "    ; And: result * 5 = (result << 2) + result",
+    "    ; Combined: result * 10 = ((result << 2) + result) << 1",
+    "    LDA $FA         ; Load current result",
+    "    STA $FD         ; Save copy",
+    "    ASL             ; result * 2",
+    "    ASL             ; result * 4",
+    "    CLC",
+    "    ADC $FD         ; result * 4 + result * 1 = result * 5",
+    "    ASL             ; result * 10",
+    "    CLC",
+    "    ADC $FE         ; Add new digit",
+    "    STA $FA         ; Store updated result",
+    "",
+    "    JMP input_loop  ; Read next character",
+    "",
+    "input_done:",
+    "    LDA $FA         ; Load final result into A",
+    "    RTS",
+    "",
+))
+
+# Relative branch instructions, which can only reach -128..+127 bytes from the next instruction
+_BRANCH_OPS = frozenset(("BCC", "BCS", "BEQ", "BNE", "BMI", "BPL", "BVC", "BVS"))
+# Assembler directives, which take no bytes in the program
+_DIRECTIVES = frozenset(("processor", "org", "SUBROUTINE"))
+# Opcodes of LDA, STA, INC and DEC with a zero-page operand, followed by the variable's address they take
+_ZERO_PAGE_OPCODES = (0xA5, 0x85, 0xE6, 0xC6)
+
+_NEGATE_SEQ = (
+    "    EOR #$FF        ; One's complement",
+    "    CLC",
+    "    ADC #1          ; Two's complement (negate)",
+)
+# Literal loads for every byte value, formatted once instead of for each literal in the program
+_LOAD_LITERAL = tuple(f"    LDA #${value:02X}      ; Load literal {value}" for value in range(0x100))
+
+_BIT_NOT_SEQ = ("    EOR #$FF        ; Bitwise NOT",)
+# Shifts by a literal count, unrolled. A count of 8 or more shifts every bit out
+_SHIFT_SEQ = {
+    T.SHIFT_LEFT: ("    ASL             ; Shift left accumulator",) * 8,
+    T.SHIFT_RIGHT: ("    LSR             ; Shift right accumulator",) * 8,
+}
+_SHIFT_OUT_SEQ = ("    LDA #0          ; Every bit shifted out",)
+_SAVE_LEFT_SEQ = ("    PHA             ; Save left operand",)
+_SAVE_LEFT_X_SEQ = ("    TAX             ; Save left operand in X",)
+_RESTORE_LEFT_X_SEQ = (
+    "    STA $FE         ; Save right operand",
+    "    TXA             ; Restore left operand",
+)
+
+# Operator sequences with local labels, filled in by CodeGenerator.emit_with_local_labels.
+# Each placeholder is named after its label's prefix, {operand} is the right operand's addressing mode
+_SHIFT_LEFT_LOOP_SEQ = (
+    "    CPX #8",
+    "    BCC {c}",
+    "    LDA #0          ; 8 or more shifts move every bit out",
+    "    TAX             ; No shifts left",
+    "{c}:",
+    "    CPX #0",
+    "    BEQ {e}",
+    "{loop}:",
+    "    ASL             ; Shift left accumulator",
+    "    DEX",
+    "    BNE {loop}",
+    "{e}:",
+)
+_SHIFT_RIGHT_LOOP_SEQ = (
+    "    CPX #8",
+    "    BCC {c}",
+    "    LDA #0          ; 8 or more shifts move every bit out",
+    "    TAX             ; No shifts left",
+    "{c}:",
+    "    CPX #0",
+    "    BEQ {e}",
+    "{loop}:",
+    "    LSR             ; Shift right accumulator",
+    "    DEX",
+    "    BNE {loop}",
+    "{e}:",
+)
+# Comparisons, by operator. Each one moves the carry flag into A with ROL instead of branching
+_COMPARE_SEQ = {
+    T.EQUAL: (
+        "    EOR {operand:<12}; Zero if left == right",
+        "    CMP #1          ; Carry set if not equal",
+        "    LDA #0",
+        "    ROL             ; Carry into bit 0",
+        "    EOR #1          ; Equal",
+    ),
+    T.NOT_EQUAL: (
+        "    EOR {operand:<12}; Zero if left == right",
+        "    CMP #1          ; Carry set if not equal",
+        "    LDA #0",
+        "    ROL             ; Not equal",
+    ),
+    T.LESS_THAN: (
+        "    CMP {operand:<12}; Carry set if left >= right",
+        "    LDA #0",
+        "    ROL             ; Carry into bit 0",
+        "    EOR #1          ; Less than",
+    ),
+    T.LESS_THAN_EQUALS: (
+        "    CLC",
+        "    SBC {operand:<12}; Carry set if left > right (left - right - 1)",
+        "    LDA #0",
+        "    ROL             ; Carry into bit 0",
+        "    EOR #1          ; Less than or equal",
+    ),
+    T.GREATER_THAN: (
+        "    CLC",
+        "    SBC {operand:<12}; Carry set if left > right (left - right - 1)",
+        "    LDA #0",
+        "    ROL             ; Greater than",
+    ),
+    T.GREATER_THAN_EQUALS: (
+        "    CMP {operand:<12}; Carry set if left >= right",
+        "    LDA #0",
+        "    ROL             ; Greater than or equal",
+    ),
+}
+
+# Truth value of A as 0/1, and its inverse
+_TO_BOOL_SEQ = (
+    "    CMP #1          ; Carry set if not zero",
+    "    LDA #0",
+    "    ROL             ; 1 if not zero",
+)
+_TO_NOT_BOOL_SEQ = (*_TO_BOOL_SEQ, "    EOR #1          ; 1 if zero")
+# Both truth values added, bit 0 of the sum is set if exactly one is true.
+# Entry: A = left operand's truth value, Y = right operand
+_XOR_ADD = (
+    "    CPY #1          ; Carry set if right is not zero",
+    "    ADC #0          ; Add right's truth value",
+    "    AND #1          ; 1 if exactly one is true",
+)
+_XOR_SEQ = (
+    "    TAY             ; Save right in Y",
+    "    PLA             ; Get left",
+    *_TO_BOOL_SEQ,
+    *_XOR_ADD,
+)
+# The same with the left operand in A, and {operand} as the right operand's addressing mode
+_XOR_OPERAND_SEQ = (
+    *_TO_BOOL_SEQ,
+    "    LDY {operand:<12}; Right operand",
+    *_XOR_ADD,
+)
+_LOGIC_OPS = frozenset((T.LOGIC_AND, T.LOGIC_OR, T.LOGIC_XOR))
+# Comparisons with a literal right operand that need no CMP, by (operator, literal)
+# x > 0 and x >= 1 are the truth value of x, x < 1 and x <= 0 its inverse
+_COMPARE_TRUTH_SEQ = {
+    (T.GREATER_THAN, 0): _TO_BOOL_SEQ,
+    (T.GREATER_THAN_EQUALS, 1): _TO_BOOL_SEQ,
+    (T.LESS_THAN, 1): _TO_NOT_BOOL_SEQ,
+    (T.LESS_THAN_EQUALS, 0): _TO_NOT_BOOL_SEQ,
+}
+# Nothing is below 0 or above 255, so these are always the same
+_COMPARE_CONSTANT = {
+    (T.LESS_THAN, 0): 0,
+    (T.GREATER_THAN_EQUALS, 0): 1,
+    (T.GREATER_THAN, 0xFF): 0,
+    (T.LESS_THAN_EQUALS, 0xFF): 1,
+}
+# Unary operators, by operator. Each sequence works on the operand in A
+_UNARY_SEQ = {
+    # Negation using two's complement: invert all bits, then add 1
+    # Example: -(5) → EOR #$FF, ADC #1 → -5
+    T.MINUS: _NEGATE_SEQ,
+    # Invert all bits: ~x
+    # Example: ~5 (00000101) → 250 (11111010)
+    T.BIT_NOT: _BIT_NOT_SEQ,
+    # 1 if zero, else 0: the operand's truth value, inverted
+    # Example: !5 → 0, !0 → 1
+    T.LOGIC_NOT: _TO_NOT_BOOL_SEQ,
+}
+
+# Kinds of lines seen by the peephole pass
+_LINE_INSTR = 0
+_LINE_LABEL = 1
+_LINE_DIRECTIVE = 2
+_LINE_OTHER = 3     # Comments and blank lines
+# Instructions that set the zero flag from the value in A (shifts only in their accumulator form)
+_SETS_Z_FROM_A = frozenset(("LDA", "PLA", "TXA", "TYA", "TAX", "TAY", "AND", "ORA", "EOR", "ADC", "SBC"))
+_SHIFT_OPS = frozenset(("ASL", "LSR", "ROL", "ROR"))
+# Instructions that leave every flag unchanged
+_KEEPS_FLAGS = frozenset(("STA", "STX", "STY"))
+# Instructions that never continue with the next one
+_END_OPS = frozenset(("JMP", "RTS", "RTI", "BRK"))
+# Carry branch replacing "LDA #0, ROL, [EOR #1], BEQ/BNE", by (branch, inverted by EOR #1)
+_CARRY_BRANCH = {
+    ("BEQ", False): "BCC",
+    ("BNE", False): "BCS",
+    ("BEQ", True): "BCS",
+    ("BNE", True): "BCC",
+}
+
+# Work item tags for the explicit stack in _gen_expr_tree
+_EVAL = 0
+_EMIT = 1
+_CALL = 2
+
+# Compile-time results of operators on 8-bit literals, matching what the generated code computes
+_FOLD_BINARY = {
+    T.PLUS: lambda a, b: (a + b) & 0xFF,
+    T.MINUS: lambda a, b: (a - b) & 0xFF,
+    T.BIT_AND: lambda a, b: a & b,
+    T.BIT_OR: lambda a, b: a | b,
+    T.BIT_XOR: lambda a, b: a ^ b,
+    T.SHIFT_LEFT: lambda a, b: (a << b) & 0xFF,
+    T.SHIFT_RIGHT: lambda a, b: a >> b,
+    T.LOGIC_AND: lambda a, b: int(a != 0 and b != 0),
+    T.LOGIC_OR: lambda a, b: int(a != 0 or b != 0),
+    T.LOGIC_XOR: lambda a, b: int((a != 0) != (b != 0)),
+    T.EQUAL: lambda a, b: int(a == b),
+    T.NOT_EQUAL: lambda a, b: int(a != b),
+    T.LESS_THAN: lambda a, b: int(a < b),
+    T.LESS_THAN_EQUALS: lambda a, b: int(a <= b),
+    T.GREATER_THAN: lambda a, b: int(a > b),
+    T.GREATER_THAN_EQUALS: lambda a, b: int(a >= b),
+}
+_FOLD_UNARY = {
+    T.MINUS: lambda a: -a & 0xFF,
+    T.BIT_NOT: lambda a: a ^ 0xFF,
+    T.LOGIC_NOT: lambda a: int(a == 0),
+}
+# Folded operators share one literal token per byte value, and one empty tuple for their children
+_NO_CHILDREN = ()
 
 class CodeGenerator:
     """
@@ -27,6 +441,12 @@ class CodeGenerator:
     
     Maximum variables: ~234 (theoretical limit 240, but upper zero-page reserved)
     """
+    __slots__ = (
+        "variables", "var_load", "var_store", "var_operand", "var_increment", "var_decrement", "var_bytes",
+        "next_var_addr", "label_counter", "local_label_counter", "local_scope_open", "zero_labels", "stack_ptr",
+        "output", "expr_code", "operand_code", "target",
+        "_stmt_table", "_id_stmt_table", "_short_circuit_table", "_binop_table",
+    )
     
     def __init__(self, target='generic'):
         """
@@ -36,12 +456,64 @@ class CodeGenerator:
             target: Target emulator ('generic' or 'py65mon')
         """
         self.variables = {}  # Maps variable name to zero-page address
+        # Lines that use a variable, formatted once when it is allocated
+        self.var_load = {}  # Maps variable name to its LDA line
+        self.var_store = {}  # Maps variable name to its STA line
+        self.var_operand = {}  # Maps variable name to its zero-page operand ("$10")
+        self.var_increment = {}  # Maps variable name to its increment statement lines
+        self.var_decrement = {}  # Maps variable name to its decrement statement lines
+        self.var_bytes = {}  # Maps variable name to its assembled LDA, STA, INC and DEC instructions (2 bytes each)
         self.next_var_addr = 0x10  # Start variables at $10 (avoid system area $00-$0F)
         self.label_counter = 0  # Counter for generating unique labels
+        self.local_label_counter = 0  # Counter for labels local to the current expression
+        self.local_scope_open = False  # Whether the current expression has started a SUBROUTINE scope
+        # Labels that BEQ branches to with A = 0 as the result, see _peephole_run.
+        # A is loaded again after each of these branches, so it isn't needed when the branch isn't taken
+        self.zero_labels = set()
         self.stack_ptr = 0x0200  # Stack starts at $0200 (not actively used, for reference)
         self.output = []  # Accumulates lines of assembly code
+        self.expr_code = {}  # Maps an EXPRESSION node to the lines generated for it, and the global labels they define
+        self.operand_code = {}  # Maps a sequence and operand to the sequence's lines, formatted with that operand
         self.target = target  # Target emulator determines I/O implementation
         
+        # Handlers for statements, by their first token
+        self._stmt_table = {
+            T.VAR: self._gen_var_declaration,
+            T.IF: self._gen_if_statement,
+            T.WHILE: self._gen_while_statement,
+            T.DO: self._gen_do_while_statement,
+            T.OPEN_CURLY: self._gen_block,
+        }
+        # Handlers for statements starting with an identifier, by their second token
+        self._id_stmt_table = {
+            T.ASSIGN: self._gen_assignment,
+            T.INCREMENT: self._gen_increment,
+            T.DECREMENT: self._gen_decrement,
+            T.OPEN_BRACE: self._gen_function_call,
+        }
+        # Handlers for short-circuit operators, which lay out the evaluation of their own operands
+        self._short_circuit_table = {
+            T.LOGIC_AND: self._gen_logical_and,
+            T.LOGIC_OR: self._gen_logical_or,
+        }
+        # Handlers for binary operators, called with the right operand in A and the left operand on the stack
+        self._binop_table = {
+            T.PLUS: self._gen_add,
+            T.MINUS: self._gen_sub,
+            T.BIT_AND: self._gen_bit_and,
+            T.BIT_OR: self._gen_bit_or,
+            T.BIT_XOR: self._gen_bit_xor,
+            T.SHIFT_LEFT: self._gen_shift_left,
+            T.SHIFT_RIGHT: self._gen_shift_right,
+            T.LOGIC_XOR: self._gen_logical_xor,
+            T.EQUAL: self._gen_equal,
+            T.NOT_EQUAL: self._gen_not_equal,
+            T.LESS_THAN: self._gen_less_than,
+            T.LESS_THAN_EQUALS: self._gen_less_than_equals,
+            T.GREATER_THAN: self._gen_greater_than,
+            T.GREATER_THAN_EQUALS: self._gen_greater_than_equals,
+        }
+        
     def generate(self, ast: Tree) -> str:
         """
         Generate complete assembly program from AST.
@@ -63,34 +535,36 @@ class CodeGenerator:
             String containing complete DASM-format assembly code
         """
         self.output = []
+        self.expr_code = {}
         
         # ===== PROGRAM HEADER =====
-        # Generate comments and DASM assembler directives
-        self.emit("; Generated 6502 Assembly Code")
-        self.emit("; Processor: 6502")
-        self.emit("")
-        
-        self.emit("    processor 6502")
-        self.emit("    org $0600    ; Start program at $0600")
-        self.emit("")
-        
-        # ===== INITIALIZE HARDWARE STACK =====
-        # The 6502 hardware stack lives at $0100-$01FF
-        # We set stack pointer to $FF so stack grows down from $01FF
-        self.emit("start:")
-        self.emit("    LDX #$FF")
-        self.emit("    TXS          ; Initialize stack pointer")
-        self.emit("")
+        # Comments, DASM assembler directives and hardware stack initialization
+        self.emit(_HEADER)
+        
+        # ===== EXPRESSION FLATTENING =====
+        # Nested EXPRESSION nodes are replaced by the node they evaluate,
+        # and the tree's nodes are listed for the next two passes
+        nodes = self._flatten_expressions(ast)
+        
+        # ===== VARIABLE ALLOCATION =====
+        # All variables get their addresses before any code is generated
+        self._allocate_variables(nodes)
+        
+        # ===== CONSTANT FOLDING =====
+        # Operators on literals are computed now, so they load a single literal
+        self._fold_constants(nodes)
         
         # ===== PROGRAM BODY =====
         # Walk the AST and generate code for all statements
         self._gen_statement_list(ast)
         
+        # ===== PEEPHOLE OPTIMIZATION =====
+        # Instruction patterns left over where the generated sequences meet are rewritten
+        self.output[1:] = self._peephole(self.output[1:])
+        
         # ===== PROGRAM TERMINATION =====
         # BRK causes a software interrupt, stopping execution
-        self.emit("")
-        self.emit("    BRK          ; End program")
-        self.emit("")
+        self.emit(_FOOTER)
         
         # ===== I/O SUBROUTINES =====
         # Append target-specific input/output routines
@@ -110,6 +584,18 @@ class CodeGenerator:
         """
         self.output.append(code)
     
+    def emit_many(self, *lines: str):
+        """
+        Add several lines of assembly code to output buffer at once.
+        
+        Fixed instruction sequences are kept as module-level tuples,
+        so they are emitted with a single call instead of one per line.
+        
+        Args:
+            lines: Lines of assembly code, in the order they are emitted
+        """
+        self.output.extend(lines)
+    
     def get_label(self, prefix: str = "L") -> str:
         """
         Generate a unique label for control flow.
@@ -127,6 +613,101 @@ class CodeGenerator:
         self.label_counter += 1
         return label
     
+    def get_local_label(self, prefix: str) -> str:
+        """
+        Generate a label local to the current expression.
+        
+        Operators define and branch to their labels within their own block of code,
+        so they only need to be unique within one expression. DASM scopes labels
+        starting with "." by SUBROUTINE, which is emitted before the expression's
+        first local label. The counter starts over in every scope.
+        
+        Args:
+            prefix: Label prefix (e.g., "t", "f", "e")
+            
+        Returns:
+            Local label string (e.g., ".t0", ".e1")
+        """
+        if not self.local_scope_open:
+            self.emit("    SUBROUTINE")
+            self.local_scope_open = True
+            self.local_label_counter = 0
+        label = f".{prefix}{self.local_label_counter}"
+        self.local_label_counter += 1
+        return label
+    
+    def emit_with_local_labels(self, template: tuple[str, ...], prefixes: tuple[str, ...], operand: str = ""):
+        """
+        Add an operator's sequence of lines, with new local labels filled in.
+        
+        Args:
+            template: Lines with a {prefix} placeholder for each label, and optionally {operand}
+            prefixes: Label prefixes, in the order the labels are taken
+            operand: Right operand's addressing mode, for sequences that use it
+        """
+        if not self.local_scope_open:
+            self.emit("    SUBROUTINE")
+            self.local_scope_open = True
+            self.local_label_counter = 0
+
+        # Number the whole sequence's labels at once, the same way get_local_label would one at a time
+        counter = self.local_label_counter
+        fields = {prefix: f".{prefix}{number}" for number, prefix in enumerate(prefixes, counter)}
+        self.local_label_counter = counter + len(prefixes)
+        fields["operand"] = operand
+        self.output.extend([line.format_map(fields) for line in template])
+    
+    def emit_with_operand(self, template: tuple[str, ...], operand: str):
+        """
+        Add a sequence of lines that use the right operand's addressing mode.
+        
+        Operands repeat throughout a program, so each sequence is formatted
+        once per operand and the same lines are added every time after that.
+        
+        Args:
+            template: Lines with an {operand} placeholder
+            operand: Right operand's addressing mode ("#$05", "$10" or "$FE")
+        """
+        key = (template, operand)
+        lines = self.operand_code.get(key)
+        if lines is None:
+            lines = self.operand_code[key] = tuple([line.format(operand=operand) for line in template])
+        self.output.extend(lines)
+    
+    def _code_size(self, lines) -> int:
+        """
+        Count the bytes that lines of generated assembly code assemble to.
+        
+        Instructions without an operand (or with A as their operand) take 1 byte.
+        Relative branches, immediate operands and zero-page addresses ($ with at
+        most 2 hex digits) take 2. Any other operand, an absolute address or a
+        symbol, takes 3. Labels, comments and directives take none.
+        
+        Args:
+            lines: Lines of assembly code, as emitted
+            
+        Returns:
+            Size of the code in bytes
+        """
+        size = 0
+        for line in lines:
+            # Labels and blank lines don't start with indentation
+            if not line.startswith("    "):
+                continue
+            code = line.split(";", 1)[0].split()
+            if not code or code[0] in _DIRECTIVES:
+                continue
+            if len(code) == 1 or code[1] == "A":
+                size += 1
+                continue
+            # Decided by the operand's syntax, since a label can be as short as a zero-page address
+            operand = code[1]
+            if code[0] in _BRANCH_OPS or operand[0] == "#" or (operand[0] == "$" and len(operand) <= 3):
+                size += 2
+            else:
+                size += 3
+        return size
+    
     def allocate_variable(self, name: str) -> int:
         """
         Allocate a zero-page address for a variable.
@@ -149,8 +730,17 @@ class CodeGenerator:
         if name not in self.variables:
             if self.next_var_addr > 0xFF:
                 raise RuntimeError("Out of zero-page memory for variables!")
-            self.variables[name] = self.next_var_addr
+            addr = self.variables[name] = self.next_var_addr
             self.next_var_addr += 1
+            
+            # Every later use of the variable only looks its lines up
+            self.var_load[name] = f"    LDA ${addr:02X}        ; Load {name}"
+            self.var_store[name] = f"    STA ${addr:02X}        ; Store to {name}"
+            self.var_operand[name] = f"${addr:02X}"
+            self.var_increment[name] = (f"    ; {name}++", f"    INC ${addr:02X}", "")
+            self.var_decrement[name] = (f"    ; {name}--", f"    DEC ${addr:02X}", "")
+            # Assembled once as well, for emitting machine code without an assembler
+            self.var_bytes[name] = tuple([bytes((opcode, addr)) for opcode in _ZERO_PAGE_OPCODES])
         return self.variables[name]
     
     def get_variable_addr(self, name: str) -> int:
@@ -170,6 +760,176 @@ class CodeGenerator:
             raise RuntimeError(f"Variable '{name}' not allocated!")
         return self.variables[name]
     
+    def get_variable_code(self, table: dict, name: str):
+        """
+        Get a preformatted line (or lines) using a previously allocated variable.
+        
+        Args:
+            table: One of the var_* tables filled by allocate_variable
+            name: Variable identifier
+            
+        Returns:
+            The variable's entry in [table]
+            
+        Raises:
+            RuntimeError: If variable was never allocated (semantic error)
+        """
+        try:
+            return table[name]
+        except KeyError:
+            self.get_variable_addr(name)
+            raise
+    
+    # ==================== Expression Flattening ====================
+    
+    def _flatten_expressions(self, ast: Tree) -> list[Tree]:
+        """
+        Replace EXPRESSION nodes nested within expression trees by their first child.
+        
+        Sometimes the grammar nesting creates EXPRESSION nodes within expression trees
+        (particularly with comparison operators). Only their first child is evaluated,
+        so they are removed once here instead of being unwrapped on every visit.
+        The EXPRESSION nodes of statements and argument lists are kept, since
+        _gen_expression expects them.
+        
+        This is the only walk over the whole tree before code generation. The nodes
+        it visits are returned as a list, which the other passes loop over instead.
+        
+        Semantic analysis shares the AST of repeated expressions, so a node can be
+        reached (and listed) more than once. Its children were already unwrapped the
+        first time, so unwrapping them again leaves them as they are.
+        
+        Args:
+            ast: The root of the abstract syntax tree (STATEMENT_LIST node)
+            
+        Returns:
+            Every node with children, each one before the nodes below it
+        """
+        expression = N.EXPRESSION
+        nodes = []
+        append = nodes.append
+        stack = [ast] if ast.nodes else []
+        while stack:
+            node = stack.pop()
+            append(node)
+            children = node.nodes
+            node_type = node.symbol.type
+            keep = node_type == N.STATEMENT or node_type == N.EXPRESSION_LIST
+            for i, child in enumerate(children):
+                if child is None:
+                    continue
+                if not keep:
+                    while child.symbol.type == expression and child.nodes:
+                        child = child.nodes[0]
+                    children[i] = child
+                if child.nodes:
+                    stack.append(child)
+        return nodes
+    
+    # ==================== Variable Allocation ====================
+    
+    def _allocate_variables(self, nodes: list[Tree]):
+        """
+        Allocate every declared variable, most read variables first.
+        
+        Runs once before code generation, so running out of zero-page
+        memory is reported before any code is emitted.
+        
+        Args:
+            nodes: Every node with children, as returned by _flatten_expressions
+        """
+        declared = {}  # Maps variable name to how often it is read, in declaration order
+        reads = []  # Names of identifiers read in expressions
+        for node in nodes:
+            children = node.nodes
+            node_type = node.symbol.type
+            first_type = children[0].symbol.type if children[0] is not None else None
+            if node_type == N.STATEMENT and first_type == T.VAR:
+                # var x = <expression>, x is declared, not read
+                declared.setdefault(children[1].symbol.value, 0)
+                start = 2
+            elif node_type == N.STATEMENT and first_type == T.ID:
+                # Assignment target, increment, decrement or the name of a called function
+                start = 1
+            elif node_type == N.VALUE and first_type == T.ID and len(children) > 1 and children[1].symbol.type == T.OPEN_BRACE:
+                # Name of a function called in an expression
+                start = 1
+            else:
+                start = 0
+            
+            # Identifiers below this node are in the list as nodes without children, so they're read here
+            for i in range(start, len(children)):
+                child = children[i]
+                if child is not None and not child.nodes and child.symbol.type == T.ID:
+                    reads.append(child.symbol.value)
+        
+        for name in reads:
+            if name in declared:
+                declared[name] += 1
+        
+        # sorted is stable, so equally read variables stay in declaration order
+        for name in sorted(declared, key=declared.get, reverse=True):
+            self.allocate_variable(name)
+    
+    # ==================== Constant Folding ====================
+    
+    def _fold_constants(self, nodes: list[Tree]):
+        """
+        Replace operators whose operands are all literals with the literal they evaluate to.
+        
+        The nodes are visited in reverse, so folded operands are already
+        literals when their operator is reached.
+        Example: var x = 2 + 3 - 1 → LDA #$04
+        
+        A shared expression's nodes are listed once per place they're used in.
+        A folded node has no children left, so it is skipped when it's reached again.
+        
+        Args:
+            nodes: Every node with children, as returned by _flatten_expressions
+        """
+        for node in reversed(nodes):
+            children = node.nodes
+            if len(children) != 2:
+                continue
+            sym_type = node.symbol.type
+            
+            # Unary operators: (OPERATOR None operand)
+            if children[0] is None:
+                fold = _FOLD_UNARY.get(sym_type)
+                operand = self._literal_value(children[1])
+                if fold is None or operand is None:
+                    continue
+                value = fold(operand)
+            
+            # Binary operators: (OPERATOR left right)
+            else:
+                fold = _FOLD_BINARY.get(sym_type)
+                if fold is None:
+                    continue
+                left = self._literal_value(children[0])
+                right = self._literal_value(children[1])
+                if left is None or right is None:
+                    continue
+                value = fold(left, right)
+            
+            node.symbol = BYTE_LITERAL_TOKENS[value]
+            node.nodes = _NO_CHILDREN
+    
+    def _literal_value(self, node: Tree) -> int | None:
+        """
+        Get the value of an operand that always evaluates to the same byte.
+        
+        Args:
+            node: Operand of an operator
+            
+        Returns:
+            The literal's value, or None if it isn't a literal that fits in a byte
+        """
+        if node is None or node.symbol.type != T.LITERAL:
+            return None
+        value = node.symbol.value
+        return value if 0 <= value <= 0xFF else None
+    
     # ==================== Statement Generation ====================
     # These methods walk the AST and generate code for different statement types.
     # They follow the grammar structure, matching AST node patterns and dispatching
@@ -180,39 +940,36 @@ class CodeGenerator:
         Generate code for a list of statements (the program body).
         
         Grammar: STATEMENT_LIST -> STATEMENT STATEMENT_LIST_NEXT
+                 STATEMENT_LIST_NEXT -> SEMICOLON STATEMENT_LIST | epsilon
         
-        This recursively processes all statements in the program, generating
-        assembly code for each one in sequence.
+        The right-recursive list is walked in a loop, generating assembly code
+        for each statement in sequence, so long programs don't need deep recursion.
         
         Args:
             node: STATEMENT_LIST AST node
         """
-        if node is None:
-            return
-        if node.symbol.type == N.STATEMENT_LIST:
-            # Generate code for first statement
-            self._gen_statement(node.nodes[0])
-            # Process remaining statements (if any)
-            if len(node.nodes) > 1:
-                self._gen_statement_list_next(node.nodes[1])
+        self._gen_list(node, N.STATEMENT_LIST, N.STATEMENT_LIST_NEXT)
     
-    def _gen_statement_list_next(self, node: Tree):
+    def _gen_list(self, node: Tree, list_type: N, next_type: N):
         """
-        Generate code for the continuation of a statement list.
-        
-        Grammar: STATEMENT_LIST_NEXT -> SEMICOLON STATEMENT_LIST | epsilon
-        
-        Handles the recursive part of statement lists. If more statements exist,
-        it recursively calls back to _gen_statement_list.
+        Generate code for each statement of a right-recursive statement list.
         
         Args:
-            node: STATEMENT_LIST_NEXT AST node
+            node: List AST node of [list_type]
+            list_type: Nonterminal holding a statement and the rest of the list
+            next_type: Nonterminal holding the next list node, if there is one
         """
-        if node is None:
-            return
-        if node.symbol.type == N.STATEMENT_LIST_NEXT:
-            if len(node.nodes) > 1:  # Has more statements
-                self._gen_statement_list(node.nodes[1])
+        gen_statement = self._gen_statement
+        while node is not None and node.symbol.type == list_type:
+            # Generate code for this statement
+            gen_statement(node.nodes[0])
+            if len(node.nodes) < 2:
+                return
+            # Move on to the remaining statements (if any)
+            rest = node.nodes[1]
+            if rest is None or rest.symbol.type != next_type or len(rest.nodes) < 2:
+                return
+            node = rest.nodes[1]
     
     def _gen_statement(self, node: Tree):
         """
@@ -243,83 +1000,97 @@ class CodeGenerator:
         if not children:
             return
         
-        first_token = children[0].symbol
-        
-        # ===== VARIABLE DECLARATION =====
-        # Pattern: VAR ID ASSIGN EXPRESSION
-        # Example: var x = 5
-        if first_token.type == T.VAR:
-            # Allocate zero-page memory for new variable
-            var_name = children[1].symbol.value
-            addr = self.allocate_variable(var_name)
-            self.emit(f"    ; var {var_name} = <expression>")
-            # Evaluate expression, result left in accumulator A
-            self._gen_expression(children[3])
-            # Store accumulator to variable's zero-page address
-            self.emit(f"    STA ${addr:02X}        ; Store to {var_name}")
-            self.emit("")
-        
-        # ===== ASSIGNMENT =====
-        # Pattern: ID ASSIGN EXPRESSION
-        # Example: x = y + 3
-        elif first_token.type == T.ID and len(children) > 1 and children[1].symbol.type == T.ASSIGN:
-            var_name = children[0].symbol.value
-            addr = self.get_variable_addr(var_name)
-            self.emit(f"    ; {var_name} = <expression>")
-            # Evaluate expression, result in A
-            self._gen_expression(children[2])
-            # Store to existing variable
-            self.emit(f"    STA ${addr:02X}        ; Store to {var_name}")
-            self.emit("")
-        
-        # ===== INCREMENT =====
-        # Pattern: ID INCREMENT
-        # Example: x++
-        # Uses efficient 6502 INC instruction (single cycle)
-        elif first_token.type == T.ID and len(children) > 1 and children[1].symbol.type == T.INCREMENT:
-            var_name = children[0].symbol.value
-            addr = self.get_variable_addr(var_name)
-            self.emit(f"    ; {var_name}++")
-            self.emit(f"    INC ${addr:02X}")
-            self.emit("")
-        
-        # ===== DECREMENT =====
-        # Pattern: ID DECREMENT
-        # Example: x--
-        # Uses efficient 6502 DEC instruction (single cycle)
-        elif first_token.type == T.ID and len(children) > 1 and children[1].symbol.type == T.DECREMENT:
-            var_name = children[0].symbol.value
-            addr = self.get_variable_addr(var_name)
-            self.emit(f"    ; {var_name}--")
-            self.emit(f"    DEC ${addr:02X}")
-            self.emit("")
-        
-        # ===== IF STATEMENT =====
-        # Delegate to specialized handler for if/else logic
-        elif first_token.type == T.IF:
-            self._gen_if_statement(children)
-        
-        # ===== WHILE LOOP =====
-        # Delegate to specialized handler for while loops
-        elif first_token.type == T.WHILE:
-            self._gen_while_statement(children)
-        
-        # ===== DO-WHILE LOOP =====
-        # Delegate to specialized handler for do-while loops
-        elif first_token.type == T.DO:
-            self._gen_do_while_statement(children)
-        
-        # ===== FUNCTION CALL =====
-        # Pattern: ID OPEN_BRACE EXPRESSION_LIST
-        # Currently supports: input(), output(value)
-        elif first_token.type == T.ID and len(children) > 1 and children[1].symbol.type == T.OPEN_BRACE:
-            self._gen_function_call(children)
-        
-        # ===== STATEMENT BLOCK =====
-        # Pattern: OPEN_CURLY GROUP_LIST CLOSE_CURLY
-        # Example: { statement1; statement2; }
-        elif first_token.type == T.OPEN_CURLY:
-            self._gen_group_list(children[1])
+        first_type = children[0].symbol.type
+        
+        # ===== STATEMENTS STARTING WITH AN IDENTIFIER =====
+        # Assignment, increment, decrement and function calls are told apart by their second token
+        if first_type == T.ID:
+            if len(children) > 1:
+                handler = self._id_stmt_table.get(children[1].symbol.type)
+                if handler is not None:
+                    handler(children)
+            return
+        
+        # ===== OTHER STATEMENTS =====
+        # Variable declarations, if/while/do-while and blocks are told apart by their first token
+        handler = self._stmt_table.get(first_type)
+        if handler is not None:
+            handler(children)
+    
+    def _gen_var_declaration(self, children):
+        """
+        Generate variable declaration with its initial value.
+        
+        Pattern: VAR ID ASSIGN EXPRESSION
+        Example: var x = 5
+        
+        Args:
+            children: Child nodes [VAR, ID, ASSIGN, EXPRESSION]
+        """
+        # Allocate zero-page memory for new variable
+        var_name = children[1].symbol.value
+        self.allocate_variable(var_name)
+        self.emit(f"    ; var {var_name} = <expression>")
+        # Evaluate expression, result left in accumulator A
+        self._gen_assigned_value(children[3])
+        # Store accumulator to variable's zero-page address
+        self.emit_many(self.var_store[var_name], "")
+    
+    def _gen_assignment(self, children):
+        """
+        Generate assignment to an existing variable.
+        
+        Pattern: ID ASSIGN EXPRESSION
+        Example: x = y + 3
+        
+        Args:
+            children: Child nodes [ID, ASSIGN, EXPRESSION]
+        """
+        var_name = children[0].symbol.value
+        store = self.get_variable_code(self.var_store, var_name)
+        self.emit(f"    ; {var_name} = <expression>")
+        # Evaluate expression, result in A
+        self._gen_assigned_value(children[2])
+        # Store to existing variable
+        self.emit_many(store, "")
+    
+    def _gen_increment(self, children):
+        """
+        Generate increment of a variable.
+        
+        Pattern: ID INCREMENT
+        Example: x++
+        Uses efficient 6502 INC instruction (single cycle)
+        
+        Args:
+            children: Child nodes [ID, INCREMENT]
+        """
+        self.emit_many(*self.get_variable_code(self.var_increment, children[0].symbol.value))
+    
+    def _gen_decrement(self, children):
+        """
+        Generate decrement of a variable.
+        
+        Pattern: ID DECREMENT
+        Example: x--
+        Uses efficient 6502 DEC instruction (single cycle)
+        
+        Args:
+            children: Child nodes [ID, DECREMENT]
+        """
+        self.emit_many(*self.get_variable_code(self.var_decrement, children[0].symbol.value))
+    
+    def _gen_block(self, children):
+        """
+        Generate statement block.
+        
+        Pattern: OPEN_CURLY GROUP_LIST CLOSE_CURLY
+        Example: { statement1; statement2; }
+        
+        Args:
+            children: Child nodes [OPEN_CURLY, GROUP_LIST, CLOSE_CURLY]
+        """
+        self._gen_group_list(children[1])
     
     def _gen_if_statement(self, children):
         """
@@ -334,7 +1105,13 @@ class CodeGenerator:
             ; Then branch code
             JMP ENDIF0       ; Skip else
         ELSE0:
-            ; Else branch code (if present)
+            ; Else branch code
+        ENDIF0:
+        
+        Without an else branch, there is nothing to skip:
+            CMP #0
+            BEQ ENDIF0       ; Jump if false (condition == 0)
+            ; Then branch code
         ENDIF0:
         
         Uses C convention: 0 = false, non-zero = true
@@ -348,29 +1125,44 @@ class CodeGenerator:
         # 0 = false, any non-zero value = true
         self._gen_expression(children[1])
         
+        # Has else statement
+        else_clause = children[3] if len(children) > 3 else None
+        has_else = else_clause is not None and bool(else_clause.nodes)
+        
         # Generate unique labels for control flow
-        else_label = self.get_label("ELSE")
+        else_label = self.get_label("ELSE") if has_else else None
         end_label = self.get_label("ENDIF")
         
         # Test condition: compare accumulator to zero
-        self.emit("    CMP #0")
-        self.emit(f"    BEQ {else_label}    ; Jump to else if false")
-        self.emit("")
+        if has_else:
+            self.emit_many(
+                "    CMP #0",
+                f"    BEQ {else_label}    ; Jump to else if false",
+                "",
+            )
+        else:
+            self.emit_many(
+                "    CMP #0",
+                f"    BEQ {end_label}    ; Skip if false",
+                "",
+            )
         
         # ===== THEN BRANCH =====
         self._gen_statement(children[2])
-        self.emit(f"    JMP {end_label}     ; Skip else branch")
-        self.emit("")
         
         # ===== ELSE BRANCH =====
-        self.emit(f"{else_label}:")
-        if len(children) > 3:
-            else_clause = children[3]
-            if else_clause.nodes:  # Has else statement
-                self._gen_statement(else_clause.nodes[1])
-        
-        self.emit(f"{end_label}:")
-        self.emit("")
+        if has_else:
+            self.emit_many(
+                f"    JMP {end_label}     ; Skip else branch",
+                "",
+                f"{else_label}:",
+            )
+            self._gen_statement(else_clause.nodes[1])
+        
+        self.emit_many(
+            f"{end_label}:",
+            "",
+        )
     
     def _gen_while_statement(self, children):
         """
@@ -379,42 +1171,61 @@ class CodeGenerator:
         Pattern: WHILE EXPRESSION STATEMENT
         
         Generated code structure:
+            JMP WHILE_C0     ; Test condition first
         WHILE0:
+            ; Loop body
+        WHILE_C0:
             ; Evaluate condition
             CMP #0
-            BEQ ENDWHILE0    ; Exit if false
-            ; Loop body
-            JMP WHILE0       ; Repeat
+            BNE WHILE0       ; Repeat if true
         ENDWHILE0:
         
         The condition is checked before each iteration, so the body
-        may never execute if the condition is initially false.
+        may never execute if the condition is initially false. With the
+        condition at the bottom, each iteration takes a single branch.
+        When the body is too long for BNE to reach back, the loop
+        uses BEQ ENDWHILE0 followed by JMP WHILE0 instead.
         
         Args:
             children: Child nodes [WHILE, EXPRESSION, STATEMENT]
         """
         loop_start = self.get_label("WHILE")
+        loop_cond = self.get_label("WHILE_C")
         loop_end = self.get_label("ENDWHILE")
         
-        # Loop entry point - condition is tested here
-        self.emit(f"{loop_start}:")
-        self.emit("    ; while condition")
-        
-        # Evaluate loop condition
-        self._gen_expression(children[1])
-        
-        # Exit loop if condition is false (A == 0)
-        self.emit("    CMP #0")
-        self.emit(f"    BEQ {loop_end}      ; Exit loop if false")
-        self.emit("")
+        # Loop entry point - condition is tested first
+        self.emit_many(
+            f"    JMP {loop_cond}    ; Test condition first",
+            f"{loop_start}:",
+        )
+        body_start = len(self.output)
         
         # ===== LOOP BODY =====
         self._gen_statement(children[2])
         
-        # Jump back to condition check
-        self.emit(f"    JMP {loop_start}    ; Loop back")
-        self.emit(f"{loop_end}:")
-        self.emit("")
+        # Evaluate loop condition
+        self.emit_many(
+            f"{loop_cond}:",
+            "    ; while condition",
+        )
+        self._gen_expression(children[1])
+        
+        # Loop back if condition is true (A != 0), CMP and BNE take 4 bytes
+        if self._code_size(self.output[body_start:]) + 4 <= 128:
+            self.emit_many(
+                "    CMP #0",
+                f"    BNE {loop_start}    ; Loop if true",
+                f"{loop_end}:",
+                "",
+            )
+        else:
+            self.emit_many(
+                "    CMP #0",
+                f"    BEQ {loop_end}      ; Exit loop if false",
+                f"    JMP {loop_start}    ; Loop back",
+                f"{loop_end}:",
+                "",
+            )
     
     def _gen_do_while_statement(self, children):
         """
@@ -438,8 +1249,10 @@ class CodeGenerator:
         loop_start = self.get_label("DO")
         
         # Loop entry point
-        self.emit(f"{loop_start}:")
-        self.emit("    ; do-while body")
+        self.emit_many(
+            f"{loop_start}:",
+            "    ; do-while body",
+        )
         
         # ===== LOOP BODY =====
         # Body executes before condition check
@@ -450,9 +1263,11 @@ class CodeGenerator:
         self._gen_expression(children[3])
         
         # Continue loop if condition is true (A != 0)
-        self.emit("    CMP #0")
-        self.emit(f"    BNE {loop_start}    ; Loop if true")
-        self.emit("")
+        self.emit_many(
+            "    CMP #0",
+            f"    BNE {loop_start}    ; Loop if true",
+            "",
+        )
     
     def _gen_function_call(self, children):
         """
@@ -480,20 +1295,25 @@ class CodeGenerator:
                 # Evaluate argument, result in A
                 self._gen_expression(expr_list.nodes[0])
                 # Call output routine (expects value in A)
-                self.emit("    JSR output_routine")
-                self.emit("")
+                self.emit_many(
+                    "    JSR output_routine",
+                    "",
+                )
         
         elif func_name == "input":
             self.emit("    ; input()")
             # Call input routine (returns value in A)
-            self.emit("    JSR input_routine")
-            self.emit("")
+            self.emit_many(
+                "    JSR input_routine",
+                "",
+            )
     
     def _gen_group_list(self, node: Tree):
         """
-        Generate code for a statement block/group.
+        Generate code for statements within a block.
         
         Grammar: GROUP_LIST -> STATEMENT GROUP_LIST_NEXT
+                 GROUP_LIST_NEXT -> SEMICOLON GROUP_LIST | epsilon
         
         Handles blocks like: { statement1; statement2; statement3; }
         Statements are executed sequentially.
@@ -501,30 +1321,7 @@ class CodeGenerator:
         Args:
             node: GROUP_LIST AST node
         """
-        if node is None:
-            return
-        if node.symbol.type == N.GROUP_LIST:
-            # Generate first statement in block
-            self._gen_statement(node.nodes[0])
-            # Process remaining statements
-            if len(node.nodes) > 1:
-                self._gen_group_list_next(node.nodes[1])
-    
-    def _gen_group_list_next(self, node: Tree):
-        """
-        Generate code for continuation of statement block.
-        
-        Grammar: GROUP_LIST_NEXT -> SEMICOLON GROUP_LIST | epsilon
-        
-        Recursively processes remaining statements in a block.
-        
-        Args:
-            node: GROUP_LIST_NEXT AST node
-        """
-        if node is None:
-            return
-        if node.symbol.type == N.GROUP_LIST_NEXT and len(node.nodes) > 1:
-            self._gen_group_list(node.nodes[1])
+        self._gen_list(node, N.GROUP_LIST, N.GROUP_LIST_NEXT)
     
     # ==================== Expression Generation ====================
     # Expression generation uses POST-ORDER TRAVERSAL to evaluate expression trees.
@@ -539,9 +1336,11 @@ class CodeGenerator:
         """
         Generate code for expression tree node using post-order traversal.
         
-        This is the core expression evaluator. It recursively walks the expression
-        tree in post-order (left-right-root), generating assembly code that
-        evaluates the expression and leaves the result in accumulator A.
+        This is the core expression evaluator. It walks the expression tree
+        in post-order (left-right-root) with an explicit stack instead of
+        recursion, generating assembly code that evaluates the expression
+        and leaves the result in accumulator A. Deeply nested expressions
+        can't exceed Python's recursion limit.
         
         Expression tree structure (created by semantic analyzer):
         - Leaf nodes: LITERAL (constants) or ID (variables)
@@ -549,6 +1348,11 @@ class CodeGenerator:
         - Unary operators: (OPERATOR None operand_subtree)
         - Function calls: VALUE nodes with special structure
         
+        Work items on the stack:
+        - (_EVAL, node, None): generate code for [node]
+        - (_EMIT, lines, None): emit a fixed sequence of lines
+        - (_CALL, method, args): call an operator helper, once its operands are evaluated
+        
         Evaluation strategy:
         For binary ops (e.g., a + b):
           1. Generate code for left operand → result in A
@@ -564,217 +1368,333 @@ class CodeGenerator:
         Args:
             node: Expression tree node (operator or operand)
         """
-        if node is None:
-            return
-        
-        sym = node.symbol
-        sym_type = sym.type
-        
-        # ===== UNWRAP NESTED EXPRESSION NODES =====
-        # Sometimes the grammar nesting creates EXPRESSION nodes within expression trees
-        # (particularly with comparison operators). We unwrap these to get to the actual operator.
-        if sym_type == N.EXPRESSION:
-            if node.nodes:
-                self._gen_expr_tree(node.nodes[0])
-            return
-        
-        # ===== HANDLE FUNCTION CALLS IN EXPRESSIONS =====
-        # Function calls like input() can appear as values in expressions
-        # Example: var x = input() + 5
-        # Pattern: VALUE -> ID OPEN_BRACE EXPRESSION_LIST NEXT_P5
-        if sym_type == N.VALUE and len(node.nodes) >= 3:
-            if (node.nodes[0].symbol.type == T.ID and 
-                node.nodes[1].symbol.type == T.OPEN_BRACE):
-                # This is a function call within an expression
-                func_name = node.nodes[0].symbol.value
-                expr_list = node.nodes[2]  # EXPRESSION_LIST
-                
-                if func_name == "input":
-                    # input() returns value in A
-                    self.emit("    ; input() function call")
-                    self.emit("    JSR input_routine")
-                elif func_name == "output":
-                    # output() with argument (side effect, also returns value in A)
-                    if expr_list.nodes and expr_list.nodes[0].symbol.type == N.EXPRESSION:
-                        self.emit("    ; output(<value>) function call")
-                        self._gen_expression(expr_list.nodes[0])
-                        self.emit("    JSR output_routine")
-                # Continue with NEXT_P5 if present (for chained operations)
-                if len(node.nodes) > 3:
-                    self._gen_expr_tree(node.nodes[3])
-                return
-        
-        # ===== BASE CASE: LITERAL =====
-        # Load immediate value into accumulator
-        # Example: 5 → LDA #$05
-        if sym_type == T.LITERAL:
-            self.emit(f"    LDA #${sym.value:02X}      ; Load literal {sym.value}")
-            return
-        
-        # ===== BASE CASE: VARIABLE =====
-        # Load variable from its zero-page address
-        # Example: x → LDA $10 (if x is at $10)
-        if sym_type == T.ID:
-            addr = self.get_variable_addr(sym.value)
-            self.emit(f"    LDA ${addr:02X}        ; Load {sym.value}")
-            return
-        
-        # ===== UNARY OPERATORS =====
-        # Pattern: (OPERATOR None operand)
-        # Left child is None to distinguish from binary operators
-        if len(node.nodes) >= 2 and node.nodes[0] is None:
-            # Generate code for operand first
-            self._gen_expr_tree(node.nodes[1])  # Result in A
+        # Items are popped from the end, so the steps of a node are pushed in reverse order
+        stack = [(_EVAL, node, None)]
+        stack_append = stack.append
+        stack_pop = stack.pop
+        
+        # Looked up once instead of for every node
+        emit = self.output.append
+        emit_lines = self.output.extend
+        var_load = self.var_load
+        binop_table = self._binop_table
+        
+        while stack:
+            kind, item, args = stack_pop()
             
-            # ----- UNARY MINUS -----
-            # Negation using two's complement: invert all bits, then add 1
-            # Example: -(5) → EOR #$FF, ADC #1 → -5
-            if sym_type == T.MINUS:
-                self.emit("    EOR #$FF        ; One's complement")
-                self.emit("    CLC")
-                self.emit("    ADC #1          ; Two's complement (negate)")
+            if kind == _EMIT:
+                emit_lines(item)
+                continue
+            if kind == _CALL:
+                item(*args)
+                continue
             
-            # ----- BITWISE NOT -----
-            # Invert all bits: ~x
-            # Example: ~5 (00000101) → 250 (11111010)
-            elif sym_type == T.BIT_NOT:
-                self.emit("    EOR #$FF        ; Bitwise NOT")
+            node = item
+            if node is None:
+                continue
             
-            # ----- LOGICAL NOT -----
-            # Boolean NOT: !x returns 1 if x==0, else 0
-            # Implements: result = (operand == 0) ? 1 : 0
-            elif sym_type == T.LOGIC_NOT:
-                label_false = self.get_label("LNOT_F")
-                label_end = self.get_label("LNOT_E")
-                self.emit("    CMP #0")
-                self.emit(f"    BNE {label_false}")
-                self.emit("    LDA #1          ; Was zero, return 1")
-                self.emit(f"    JMP {label_end}")
-                self.emit(f"{label_false}:")
-                self.emit("    LDA #0          ; Was non-zero, return 0")
-                self.emit(f"{label_end}:")
-            return
-        
-        # ===== BINARY OPERATORS =====
-        # Pattern: (OPERATOR left right)
-        # Standard post-order evaluation with stack for left operand
-        if len(node.nodes) >= 2:
-            left = node.nodes[0]
-            right = node.nodes[1]
+            sym = node.symbol
+            sym_type = sym.type
+            nodes = node.nodes
+            n = len(nodes)
             
-            # Step 1: Evaluate left subtree (result in A)
-            self._gen_expr_tree(left)
+            # ===== HANDLE FUNCTION CALLS IN EXPRESSIONS =====
+            # Function calls like input() can appear as values in expressions
+            # Example: var x = input() + 5
+            # Pattern: VALUE -> ID OPEN_BRACE EXPRESSION_LIST NEXT_P5
+            if sym_type == N.VALUE and n >= 3:
+                first = nodes[0].symbol
+                if first.type == T.ID and nodes[1].symbol.type == T.OPEN_BRACE:
+                    # This is a function call within an expression
+                    func_name = first.value
+                    expr_list = nodes[2]  # EXPRESSION_LIST
+                    
+                    if func_name == "input":
+                        # input() returns value in A
+                        self.emit_many(
+                            "    ; input() function call",
+                            "    JSR input_routine",
+                        )
+                    elif func_name == "output":
+                        # output() with argument (side effect, also returns value in A)
+                        if expr_list.nodes and expr_list.nodes[0].symbol.type == N.EXPRESSION:
+                            self.emit("    ; output(<value>) function call")
+                            self._gen_expression(expr_list.nodes[0])
+                            self.emit("    JSR output_routine")
+                    # Continue with NEXT_P5 if present (for chained operations)
+                    if n > 3:
+                        stack_append((_EVAL, nodes[3], None))
+                    continue
             
-            # Step 2: Save left operand to hardware stack
-            self.emit("    PHA             ; Save left operand")
+            # ===== BASE CASE: LITERAL =====
+            # Load immediate value into accumulator
+            # Example: 5 → LDA #$05
+            if sym_type == T.LITERAL:
+                value = sym.value
+                if 0 <= value <= 0xFF:
+                    emit(_LOAD_LITERAL[value])
+                else:
+                    emit(f"    LDA #${value:02X}      ; Load literal {value}")
+                continue
             
-            # Step 3: Evaluate right subtree (result in A)
-            # This may overwrite A, but left operand is safely on stack
-            self._gen_expr_tree(right)
+            # ===== BASE CASE: VARIABLE =====
+            # Load variable from its zero-page address
+            # Example: x → LDA $10 (if x is at $10)
+            if sym_type == T.ID:
+                emit(self.get_variable_code(var_load, sym.value))
+                continue
             
-            # Step 4: Apply the operator
-            # Right operand is in A, left operand is on stack
-            # Most operations: pop left, store right in $FE, operate, result in A
+            if n < 2:
+                continue
+            left = nodes[0]
+            right = nodes[1]
             
-            # ----- ADDITION -----
-            # left + right
-            if sym_type == T.PLUS:
-                self.emit("    STA $FE         ; Save right operand")
-                self.emit("    PLA             ; Restore left operand")
-                self.emit("    CLC")
-                self.emit("    ADC $FE         ; Add")
+            # ===== UNARY OPERATORS =====
+            # Pattern: (OPERATOR None operand)
+            # Left child is None to distinguish from binary operators
+            if left is None:
+                # The operator's sequence is looked up in _UNARY_SEQ, it runs on the operand in A
+                sequence = _UNARY_SEQ.get(sym_type)
+                if sequence is not None:
+                    stack_append((_EMIT, sequence, None))
+                
+                # The operand is generated first, result in A
+                stack_append((_EVAL, right, None))
+                continue
             
-            # ----- SUBTRACTION -----
-            # left - right
-            # Uses SEC (set carry) for borrow
-            elif sym_type == T.MINUS:
-                self.emit("    STA $FE         ; Save right operand")
-                self.emit("    PLA             ; Restore left operand")
-                self.emit("    SEC")
-                self.emit("    SBC $FE         ; Subtract")
+            # ===== BINARY OPERATORS =====
+            # Pattern: (OPERATOR left right)
+            # Standard post-order evaluation with stack for left operand
             
-            # ----- BITWISE AND -----
-            # left & right (bit-by-bit AND)
-            elif sym_type == T.BIT_AND:
-                self.emit("    STA $FE         ; Save right operand")
-                self.emit("    PLA             ; Restore left operand")
-                self.emit("    AND $FE         ; Bitwise AND")
+            # ----- SHORT-CIRCUIT OPERATORS -----
+            # && and || only evaluate the right operand when the left one doesn't decide the result
+            handler = self._short_circuit_table.get(sym_type)
+            if handler is not None:
+                stack.extend(reversed(handler(left, right)))
+                continue
             
-            # ----- BITWISE OR -----
-            # left | right (bit-by-bit OR)
-            elif sym_type == T.BIT_OR:
-                self.emit("    STA $FE         ; Save right operand")
-                self.emit("    PLA             ; Restore left operand")
-                self.emit("    ORA $FE         ; Bitwise OR")
+            # ----- LOGICAL OPERATOR WITH A LITERAL -----
+            # A literal operand decides the result, or leaves only the other operand's truth value
+            # Example: x && 1 → LDA $10, CMP #1, LDA #0, ROL
+            if sym_type in _LOGIC_OPS:
+                items = self._logical_with_literal(sym_type, left, right)
+                if items is not None:
+                    stack.extend(reversed(items))
+                    continue
             
-            # ----- BITWISE XOR -----
-            # left ^ right (bit-by-bit exclusive OR)
-            elif sym_type == T.BIT_XOR:
-                self.emit("    STA $FE         ; Save right operand")
-                self.emit("    PLA             ; Restore left operand")
-                self.emit("    EOR $FE         ; Bitwise XOR")
+            # ----- COMPARISON WITH A BOUNDARY LITERAL -----
+            # Against 0, 1 or 255 a comparison is constant, or the other operand's truth value
+            # Example: x > 0 → LDA $10, CMP #1, LDA #0, ROL
+            if sym_type in _COMPARE_SEQ:
+                items = self._compare_with_literal(sym_type, left, right)
+                if items is not None:
+                    stack.extend(reversed(items))
+                    continue
             
-            # ----- SHIFT LEFT -----
-            # left << right (multiply by 2^right)
-
-            elif sym_type == T.SHIFT_LEFT:
-                self._gen_shift_left()
+            # ----- SHIFT BY A LITERAL -----
+            # A known count is unrolled into that many shifts, no loop or count in X needed
+            # Example: x << 2 → LDA $10, ASL, ASL
+            if sym_type in _SHIFT_SEQ:
+                count = self._literal_value(right)
+                if count is not None:
+                    stack_append((_EMIT, _SHIFT_SEQ[sym_type][:count] if count < 8 else _SHIFT_OUT_SEQ, None))
+                    stack_append((_EVAL, left, None))
+                    continue
             
-            # ----- SHIFT RIGHT -----
-            # left >> right (divide by 2^right)
-
-            elif sym_type == T.SHIFT_RIGHT:
-                self._gen_shift_right()
+            # ----- LEAF OPERAND -----
+            # A literal or variable operand is used by the instruction itself, no stack or $FE needed
+            # Example: x + 5 → LDA $10, CLC, ADC #$05
+            if sym_type in _DIRECT_OPS:
+                plan = self._direct_plan(sym_type, left, right)
+                if plan is not None:
+                    op_type, other, operand = plan
+                    stack_append((_CALL, binop_table[op_type], (operand,)))
+                    stack_append((_EVAL, other, None))
+                    continue
+                
+                # ----- LEFT OPERAND IN X -----
+                # When the right operand's code never changes X, X holds the left operand instead of the stack
+                # Example: x + (y - z) → LDA $10, TAX, <y - z>, STA $FE, TXA, CLC, ADC $FE
+                if self._keeps_x(right):
+                    stack_append((_CALL, binop_table[sym_type], ("$FE",)))
+                    stack_append((_EMIT, _RESTORE_LEFT_X_SEQ, None))
+                    stack_append((_EVAL, right, None))
+                    stack_append((_EMIT, _SAVE_LEFT_X_SEQ, None))
+                    stack_append((_EVAL, left, None))
+                    continue
             
-            # ----- LOGICAL AND -----
-            # left && right (returns 1 if both non-zero, else 0)
-
-            elif sym_type == T.LOGIC_AND:
-                self._gen_logical_and()
+            # Step 4: Apply the operator
+            # Right operand is in A, left operand is on stack
+            # Most operations: pop left, store right in $FE, operate, result in A
+            # The operator's helper is looked up in _binop_table instead of comparing against each operator
+            handler = binop_table.get(sym_type)
+            if handler is not None:
+                stack_append((_CALL, handler, ()))
             
-            # ----- LOGICAL OR -----
-            # left || right (returns 1 if either non-zero, else 0)
-
-            elif sym_type == T.LOGIC_OR:
-                self._gen_logical_or()
+            # Step 3: Evaluate right subtree (result in A)
+            # This may overwrite A, but left operand is safely on stack
+            stack_append((_EVAL, right, None))
             
-            # ----- LOGICAL XOR -----
-            # left ^^ right (returns 1 if exactly one is non-zero, else 0)
-
-            elif sym_type == T.LOGIC_XOR:
-                self._gen_logical_xor()
+            # Step 2: Save left operand to hardware stack
+            stack_append((_EMIT, _SAVE_LEFT_SEQ, None))
             
-            # ----- EQUALITY -----
-            # left == right (returns 1 if equal, else 0)
-            elif sym_type == T.EQUAL:
-                self._gen_equal()
+            # Step 1: Evaluate left subtree (result in A)
+            stack_append((_EVAL, left, None))
+    
+    def _direct_plan(self, sym_type: T, left: Tree, right: Tree) -> tuple[T, Tree, str] | None:
+        """
+        Plan a binary operator in _DIRECT_OPS whose right operand is a leaf.
+        
+        When only the left operand is a leaf, commutative operators and
+        comparisons swap their operands (a < b is b > a). Leaves have no
+        side effects, so the other operand can be evaluated first.
+        
+        Args:
+            sym_type: Operator type
+            left: Left operand
+            right: Right operand
             
-            # ----- INEQUALITY -----
-            # left != right (returns 1 if not equal, else 0)
-            elif sym_type == T.NOT_EQUAL:
-                self._gen_not_equal()
+        Returns:
+            The (operator, operand to evaluate into A, leaf addressing mode), or None without a usable leaf
+        """
+        operand = self._direct_operand(right)
+        if operand is not None:
+            return sym_type, left, operand
+        if sym_type in _SWAPPED_OPS:
+            operand = self._direct_operand(left)
+            if operand is not None:
+                return _SWAPPED_OPS[sym_type], right, operand
+        return None
+    
+    def _logical_with_literal(self, sym_type: T, left: Tree, right: Tree) -> tuple | None:
+        """
+        Plan a logical operator (&&, ||, ^^) with a literal operand.
+        
+        The other operand is still evaluated when the original operator
+        would evaluate it, so input() calls in it happen the same way.
+        
+        Args:
+            sym_type: Operator type
+            left: Left operand
+            right: Right operand
             
-            # ----- LESS THAN -----
-            # left < right (returns 1 if true, else 0)
-            elif sym_type == T.LESS_THAN:
-                self._gen_less_than()
+        Returns:
+            The work items for _gen_expr_tree, or None without a literal operand
+        """
+        value = self._literal_value(left)
+        other = right
+        literal_first = value is not None
+        if not literal_first:
+            value = self._literal_value(right)
+            other = left
+            if value is None:
+                return None
+        
+        if sym_type == T.LOGIC_XOR:
+            # x ^^ 0 is the truth value of x, x ^^ 1 its inverse
+            return ((_EVAL, other, None), (_EMIT, _TO_NOT_BOOL_SEQ if value else _TO_BOOL_SEQ, None))
+        
+        # A false literal decides &&, a true one decides ||
+        if (value != 0) == (sym_type == T.LOGIC_OR):
+            result = (_EMIT, (_LOAD_LITERAL[int(value != 0)],), None)
+            # Short-circuit evaluation skips an operand after the deciding one
+            return (result,) if literal_first else ((_EVAL, other, None), result)
+        return ((_EVAL, other, None), (_EMIT, _TO_BOOL_SEQ, None))
+    
+    def _compare_with_literal(self, sym_type: T, left: Tree, right: Tree) -> tuple | None:
+        """
+        Plan a comparison with a literal at or next to the end of the byte range.
+        
+        The other operand is left out if it's a leaf, otherwise it is still
+        evaluated, so input() calls in it happen the same way.
+        
+        Args:
+            sym_type: Operator type
+            left: Left operand
+            right: Right operand
             
-            # ----- LESS THAN OR EQUAL -----
-            # left <= right (returns 1 if true, else 0)
-            elif sym_type == T.LESS_THAN_EQUALS:
-                self._gen_less_than_equals()
+        Returns:
+            The work items for _gen_expr_tree, or None if the comparison needs a CMP
+        """
+        value = self._literal_value(right)
+        other = left
+        if value is None:
+            value = self._literal_value(left)
+            if value is None:
+                return None
+            # 5 > x is x < 5
+            sym_type = _SWAPPED_OPS[sym_type]
+            other = right
+        
+        key = (sym_type, value)
+        sequence = _COMPARE_TRUTH_SEQ.get(key)
+        if sequence is not None:
+            return ((_EVAL, other, None), (_EMIT, sequence, None))
+        
+        result = _COMPARE_CONSTANT.get(key)
+        if result is None:
+            return None
+        result = (_EMIT, (_LOAD_LITERAL[result],), None)
+        return (result,) if not other.nodes else ((_EVAL, other, None), result)
+    
+    def _keeps_x(self, node: Tree) -> bool:
+        """
+        Check that the code generated for an expression never changes the X register.
+        
+        Shifts that aren't by a literal keep their count in X, an operator in
+        _DIRECT_OPS without a leaf operand holds its left operand in X, and the
+        I/O routines called for VALUE nodes use X.
+        
+        Args:
+            node: Expression tree node
+            
+        Returns:
+            True if X keeps its value while [node] is evaluated
+        """
+        # Walked with a stack, like _gen_expr_tree
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node is None or not node.nodes:
+                continue
             
-            # ----- GREATER THAN -----
-            # left > right (returns 1 if true, else 0)
-            elif sym_type == T.GREATER_THAN:
-                self._gen_greater_than()
+            sym_type = node.symbol.type
+            if sym_type == N.VALUE:
+                return False
             
-            # ----- GREATER THAN OR EQUAL -----
-            # left >= right (returns 1 if true, else 0)
-            elif sym_type == T.GREATER_THAN_EQUALS:
-                self._gen_greater_than_equals()
+            left, right = node.nodes[0], node.nodes[1] if len(node.nodes) > 1 else None
+            if sym_type in _SHIFT_SEQ:
+                if self._literal_value(right) is None:
+                    return False
+                stack.append(left)
+            elif sym_type in _DIRECT_OPS and left is not None:
+                plan = self._direct_plan(sym_type, left, right)
+                if plan is None:
+                    return False
+                stack.append(plan[1])
+            else:
+                stack.append(left)
+                stack.append(right)
+        return True
+    
+    def _direct_operand(self, node: Tree) -> str | None:
+        """
+        Get the addressing mode operand for a leaf expression.
+        
+        Args:
+            node: Operand of a binary operator
             
-            return
+        Returns:
+            "#$XX" for a literal that fits in a byte, "$XX" for a variable, otherwise None
+        """
+        if node is None:
+            return None
+        sym = node.symbol
+        if sym.type == T.LITERAL:
+            return f"#${sym.value:02X}" if 0 <= sym.value <= 0xFF else None
+        if sym.type == T.ID:
+            return self.get_variable_code(self.var_operand, sym.value)
+        return None
     
     def _gen_expression(self, node: Tree):
         """
@@ -782,7 +1702,9 @@ class CodeGenerator:
         
         This is the public entry point for expression code generation.
         It expects an EXPRESSION node from the AST and delegates to
-        _gen_expr_tree for the actual code generation.
+        _gen_expr_tree for the actual code generation. The lines generated
+        for each EXPRESSION node are kept, and copied when the same node
+        is generated again (with new global labels, see _relabel).
         
         The semantic analyzer restructures the parse tree into an expression
         tree where:
@@ -804,39 +1726,160 @@ class CodeGenerator:
         if not node.nodes:
             return
         
+        # Semantic analysis shares one AST between identical expressions, whose code is the same too
+        cached = self.expr_code.get(node)
+        if cached is not None:
+            code, labels = cached
+            if labels:
+                code = self._relabel(code, labels)
+            self.output.extend(code)
+            # Operators after the copied code can't continue its label scope
+            self.local_scope_open = False
+            return
+        
+        # Labels of the operators in this expression get a new local scope
+        self.local_scope_open = False
+        
         # Delegate to recursive tree walker
+        start = len(self.output)
         self._gen_expr_tree(node.nodes[0])
+        code = self.output[start:]
+        # Global labels (of && and ||) are defined once per copy, so each copy gets new ones
+        labels = tuple([line[:-1] for line in code if line.endswith(":") and line[0] not in " ."])
+        self.expr_code[node] = (code, labels)
+    
+    def _relabel(self, code: list[str], labels: tuple[str, ...]) -> list[str]:
+        """
+        Give a copy of an expression's code new global labels.
+        
+        Local labels are scoped by the SUBROUTINE each copy starts,
+        but global labels can only be defined once in a program.
+        
+        Args:
+            code: Lines generated for the expression
+            labels: Global labels defined in [code]
+            
+        Returns:
+            The lines, with every label in [labels] replaced by a new one
+        """
+        renamed = {}
+        for label in labels:
+            new_label = renamed[label] = self.get_label(label.rstrip("0123456789"))
+            if label in self.zero_labels:
+                self.zero_labels.add(new_label)
+        pattern = re.compile(r"\b(?:" + "|".join(labels) + r")\b")
+        return [pattern.sub(lambda match: renamed[match[0]], line) for line in code]
+    
+    def _gen_assigned_value(self, node: Tree):
+        """
+        Generate code for the value of a declaration or assignment.
+        
+        Most assigned values are a lone literal or variable, which are loaded
+        directly instead of going through _gen_expression. Anything else is
+        generated by _gen_expression.
+        
+        Result is always left in accumulator A.
+        
+        Args:
+            node: EXPRESSION AST node from semantic analyzer
+        """
+        root = node.nodes[0] if node is not None and node.nodes else None
+        if root is not None and not root.nodes:
+            sym = root.symbol
+            if sym.type == T.ID:
+                self.emit(self.get_variable_code(self.var_load, sym.value))
+                return
+            if sym.type == T.LITERAL and 0 <= sym.value <= 0xFF:
+                self.emit(_LOAD_LITERAL[sym.value])
+                return
+        self._gen_expression(node)
     
     # ==================== Binary Operator Helpers ====================
-    # These methods generate code for complex operations that require
-    # loops or multiple branches. They are called with:
+    # These methods generate code for each binary operator, from single
+    # instructions to operations that require loops or multiple branches.
+    # They are called through _binop_table with:
     #   - Right operand in accumulator A
     #   - Left operand on hardware stack
+    # Operators in _DIRECT_OPS can instead be given the right operand's addressing
+    # mode ("#$05" or "$10"), in which case the left operand is in accumulator A.
     # They must leave the result in accumulator A.
     
+    def _gen_add(self, operand: str | None = None):
+        """
+        Generate addition: left + right.
+        
+        CLC before ADC, so no carry is added in.
+        """
+        if operand is None:
+            self.emit_many(*_ADD_SEQ)
+        else:
+            self.emit_with_operand(_ADD_OPERAND_SEQ, operand)
+    
+    def _gen_sub(self, operand: str | None = None):
+        """
+        Generate subtraction: left - right.
+        
+        SEC before SBC, so no borrow is taken.
+        """
+        if operand is None:
+            self.emit_many(*_SUB_SEQ)
+        else:
+            self.emit_with_operand(_SUB_OPERAND_SEQ, operand)
+    
+    def _gen_bit_and(self, operand: str | None = None):
+        """Generate bitwise AND: left & right."""
+        if operand is None:
+            self.emit_many(*_AND_SEQ)
+        else:
+            self.emit_with_operand(_AND_OPERAND_SEQ, operand)
+    
+    def _gen_bit_or(self, operand: str | None = None):
+        """Generate bitwise OR: left | right."""
+        if operand is None:
+            self.emit_many(*_ORA_SEQ)
+        else:
+            self.emit_with_operand(_ORA_OPERAND_SEQ, operand)
+    
+    def _gen_bit_xor(self, operand: str | None = None):
+        """Generate bitwise XOR: left ^ right."""
+        if operand is None:
+            self.emit_many(*_EOR_SEQ)
+        else:
+            self.emit_with_operand(_EOR_OPERAND_SEQ, operand)
+    
+    def _restore_operands(self, operand: str | None) -> str:
+        """
+        Get the left operand into A for a comparison.
+        
+        Args:
+            operand: Right operand's addressing mode, or None if it was evaluated into A
+            
+        Returns:
+            Operand to compare A with
+        """
+        if operand is None:
+            self.emit_many(*_RESTORE_OPERANDS)
+            return "$FE"
+        return operand
+    
     def _gen_shift_left(self):
         """
         Generate left shift: left << right.
         
         Multiplies left by 2^right using repeated ASL (arithmetic shift left).
         Since the 6502 doesn't have a shift-by-count instruction, we use a loop.
+        The loop tests its count at the bottom, and a count of 8 or more gives 0 without looping.
         
         Entry: A = shift count (right operand), stack = value (left operand)
         Exit: A = shifted result
         
         Example: 3 << 2 = 12 (shift 3 left by 2 positions)
         """
-        self.emit("    TAX             ; Shift count in X")
-        self.emit("    PLA             ; Get value")
-        loop_label = self.get_label("SHL")
-        end_label = self.get_label("SHL_E")
-        self.emit(f"{loop_label}:")
-        self.emit("    CPX #0")
-        self.emit(f"    BEQ {end_label}")
-        self.emit("    ASL             ; Shift left accumulator")
-        self.emit("    DEX")
-        self.emit(f"    JMP {loop_label}")
-        self.emit(f"{end_label}:")
+        self.emit_many(
+            "    TAX             ; Shift count in X",
+            "    PLA             ; Get value",
+        )
+        self.emit_with_local_labels(_SHIFT_LEFT_LOOP_SEQ, ("c", "loop", "e"))
     
     def _gen_shift_right(self):
         """
@@ -844,95 +1887,162 @@ class CodeGenerator:
         
         Divides left by 2^right using repeated LSR (logical shift right).
         Uses a loop since 6502 lacks variable-count shift instructions.
+        The loop tests its count at the bottom, and a count of 8 or more gives 0 without looping.
         
         Entry: A = shift count (right operand), stack = value (left operand)
         Exit: A = shifted result
         
         Example: 12 >> 2 = 3 (shift 12 right by 2 positions)
         """
-        self.emit("    TAX             ; Shift count in X")
-        self.emit("    PLA             ; Get value")
-        loop_label = self.get_label("SHR")
-        end_label = self.get_label("SHR_E")
-        self.emit(f"{loop_label}:")
-        self.emit("    CPX #0")
-        self.emit(f"    BEQ {end_label}")
-        self.emit("    LSR             ; Shift right accumulator")
-        self.emit("    DEX")
-        self.emit(f"    JMP {loop_label}")
-        self.emit(f"{end_label}:")
+        self.emit_many(
+            "    TAX             ; Shift count in X",
+            "    PLA             ; Get value",
+        )
+        self.emit_with_local_labels(_SHIFT_RIGHT_LOOP_SEQ, ("c", "loop", "e"))
     
-    def _gen_logical_and(self):
+    def _gen_logical_and(self, left: Tree, right: Tree) -> tuple:
         """
-        Generate logical AND: left && right.
+        Generate logical AND: left && right, with short-circuit evaluation.
         
         Boolean AND operation: returns 1 if both operands are non-zero, else 0.
         Treats any non-zero value as true, zero as false.
+        The right operand is only evaluated if the left operand is true,
+        so its side effects (like input()) don't happen otherwise.
         
-        Entry: A = right operand, stack = left operand
+        Both false operands branch straight to the end, where A is already 0,
+        and a true right operand falls through into LDA #1, so no JMP is needed.
+        
+        The label is global, since the right operand's code lies between
+        the branch and its target and may start a new local label scope.
+        Copies of a shared expression's code are given new labels by _relabel.
+        When the right operand is too long for BEQ to skip, the left operand
+        uses BNE past LDA #0 and JMP AND_E0 instead (see _reach_past_right).
+        
+        Returns the work items for _gen_expr_tree, in the order they run.
         Exit: A = 1 (both true) or 0 (at least one false)
         
         Truth table:
-        - left=0, right=0 → 0
-        - left=0, right≠0 → 0
+        - left=0, right not evaluated → 0
         - left≠0, right=0 → 0
         - left≠0, right≠0 → 1
         """
-        self.emit("    TAY             ; Save right in Y")
-        self.emit("    PLA             ; Get left")
-        label_false = self.get_label("AND_F")
         label_end = self.get_label("AND_E")
-        self.emit("    CMP #0")
-        self.emit(f"    BEQ {label_false}   ; Left is false")
-        self.emit("    TYA             ; Check right")
-        self.emit("    CMP #0")
-        self.emit(f"    BEQ {label_false}   ; Right is false")
-        self.emit("    LDA #1          ; Both true")
-        self.emit(f"    JMP {label_end}")
-        self.emit(f"{label_false}:")
-        self.emit("    LDA #0          ; At least one false")
-        self.emit(f"{label_end}:")
+        self.zero_labels.add(label_end)
+        right_start = []
+        
+        return (
+            (_EVAL, left, None),
+            (_EMIT, (
+                "    CMP #0",
+                f"    BEQ {label_end}   ; Left is false, A is already 0",
+            ), None),
+            (_CALL, self._mark_output, (right_start,)),
+            (_EVAL, right, None),
+            # CMP, BEQ and LDA lie between the right operand and AND_E0
+            (_CALL, self._reach_past_right, (right_start, 6, "AND_R", (
+                "    BNE {label}    ; Left is true, evaluate right",
+                "    LDA #0          ; Left is false",
+                f"    JMP {label_end}   ; Too far to branch",
+                "{label}:",
+            ))),
+            (_EMIT, (
+                "    CMP #0",
+                f"    BEQ {label_end}   ; Right is false, A is already 0",
+                "    LDA #1          ; Both true",
+                f"{label_end}:",
+            ), None),
+        )
     
-    def _gen_logical_or(self):
+    def _gen_logical_or(self, left: Tree, right: Tree) -> tuple:
         """
-        Generate logical OR: left || right.
+        Generate logical OR: left || right, with short-circuit evaluation.
         
         Boolean OR operation: returns 1 if either operand is non-zero, else 0.
         Treats any non-zero value as true, zero as false.
+        The right operand is only evaluated if the left operand is false,
+        so its side effects (like input()) don't happen otherwise.
         
-        Entry: A = right operand, stack = left operand
+        A true right operand falls through into the true operand's LDA #1, and a false
+        one branches past it to the end, where A is already 0, so no JMP is needed.
+        
+        Labels are global, for the same reason as in _gen_logical_and.
+        When the right operand is too long for BNE to skip, the left operand
+        uses BEQ past JMP OR_T0 instead (see _reach_past_right).
+        
+        Returns the work items for _gen_expr_tree, in the order they run.
         Exit: A = 1 (at least one true) or 0 (both false)
         
         Truth table:
         - left=0, right=0 → 0
         - left=0, right≠0 → 1
-        - left≠0, right=0 → 1
-        - left≠0, right≠0 → 1
+        - left≠0, right not evaluated → 1
         """
-        self.emit("    TAY             ; Save right in Y")
-        self.emit("    PLA             ; Get left")
         label_true = self.get_label("OR_T")
-        label_false = self.get_label("OR_F")
         label_end = self.get_label("OR_E")
-        self.emit("    CMP #0")
-        self.emit(f"    BNE {label_true}    ; Left is true")
-        self.emit("    TYA             ; Check right")
-        self.emit("    CMP #0")
-        self.emit(f"    BNE {label_true}    ; Right is true")
-        self.emit(f"    JMP {label_false}")
-        self.emit(f"{label_true}:")
-        self.emit("    LDA #1          ; At least one true")
-        self.emit(f"    JMP {label_end}")
-        self.emit(f"{label_false}:")
-        self.emit("    LDA #0          ; Both false")
-        self.emit(f"{label_end}:")
-    
-    def _gen_logical_xor(self):
+        self.zero_labels.add(label_end)
+        right_start = []
+        
+        return (
+            (_EVAL, left, None),
+            (_EMIT, (
+                "    CMP #0",
+                f"    BNE {label_true}    ; Left is true, skip right",
+            ), None),
+            (_CALL, self._mark_output, (right_start,)),
+            (_EVAL, right, None),
+            # CMP and BEQ lie between the right operand and OR_T0
+            (_CALL, self._reach_past_right, (right_start, 4, "OR_R", (
+                "    BEQ {label}    ; Left is false, evaluate right",
+                f"    JMP {label_true}    ; Left is true, too far to branch",
+                "{label}:",
+            ))),
+            (_EMIT, (
+                "    CMP #0",
+                f"    BEQ {label_end}    ; Both false, A is already 0",
+                f"{label_true}:",
+                "    LDA #1          ; At least one true",
+                f"{label_end}:",
+            ), None),
+        )
+    
+    def _mark_output(self, mark: list[int]):
+        """
+        Record where the next generated line goes, for a later work item.
+        
+        Args:
+            mark: List the output's current length is appended to
+        """
+        mark.append(len(self.output))
+    
+    def _reach_past_right(self, right_start: list[int], tail_size: int, prefix: str, far_template: tuple[str, ...]):
+        """
+        Make the branch that skips a short-circuit operator's right operand reach its target.
+        
+        A relative branch reaches at most 127 bytes forward. The right operand's
+        code is only known once it's generated, so it's measured then, and if the
+        branch before it can't reach past it, the branch is replaced by an inverted
+        branch around a JMP, like a while loop with a long body.
+        
+        Args:
+            right_start: Index of the right operand's first line, set by _mark_output
+            tail_size: Bytes between the end of the right operand and the branch target
+            prefix: Label prefix for the inverted branch's target
+            far_template: Lines that replace the branch, with a {label} placeholder
+        """
+        start = right_start[0]
+        if self._code_size(self.output[start:]) + tail_size <= 127:
+            return
+        label = self.get_label(prefix)
+        self.output[start - 1:start] = [line.format(label=label) for line in far_template]
+    
+    def _gen_logical_xor(self, operand: str | None = None):
         """
         Generate logical XOR: left ^^ right.
         
         Boolean XOR operation: returns 1 if exactly one operand is non-zero, else 0.
         Treats any non-zero value as true, zero as false.
+        Adds both truth values with no branches, bit 0 of the sum is the result.
+        The right operand is tested in Y, so a direct operand is loaded with LDY.
         
         Entry: A = right operand, stack = left operand
         Exit: A = 1 (exactly one true) or 0 (both true or both false)
@@ -943,166 +2053,346 @@ class CodeGenerator:
         - left≠0, right=0 → 1
         - left≠0, right≠0 → 0
         """
-        self.emit("    TAY             ; Save right in Y")
-        self.emit("    PLA             ; Get left")
-        label_l_true = self.get_label("XOR_LT")
-        label_l_false = self.get_label("XOR_LF")
-        label_result_true = self.get_label("XOR_RT")
-        label_result_false = self.get_label("XOR_RF")
-        label_end = self.get_label("XOR_E")
-        self.emit("    CMP #0")
-        self.emit(f"    BNE {label_l_true}")
-        self.emit(f"{label_l_false}:")
-        self.emit("    TYA")
-        self.emit("    CMP #0")
-        self.emit(f"    BEQ {label_result_false}  ; L=F, R=F -> F")
-        self.emit(f"    JMP {label_result_true}   ; L=F, R=T -> T")
-        self.emit(f"{label_l_true}:")
-        self.emit("    TYA")
-        self.emit("    CMP #0")
-        self.emit(f"    BEQ {label_result_true}   ; L=T, R=F -> T")
-        self.emit(f"    JMP {label_result_false}  ; L=T, R=T -> F")
-        self.emit(f"{label_result_true}:")
-        self.emit("    LDA #1")
-        self.emit(f"    JMP {label_end}")
-        self.emit(f"{label_result_false}:")
-        self.emit("    LDA #0")
-        self.emit(f"{label_end}:")
-    
-    def _gen_equal(self):
+        if operand is None:
+            self.emit_many(*_XOR_SEQ)
+        else:
+            self.emit_with_operand(_XOR_OPERAND_SEQ, operand)
+    
+    def _gen_equal(self, operand: str | None = None):
         """
         Generate equality comparison: left == right.
         
         Returns 1 if operands are equal, 0 otherwise.
-        Uses CMP instruction which sets flags based on subtraction.
+        EOR leaves zero only for equal operands, and CMP #1 turns that into the carry flag.
         
         Entry: A = right operand, stack = left operand
         Exit: A = 1 (equal) or 0 (not equal)
         """
-        self.emit("    STA $FE         ; Save right operand")
-        self.emit("    PLA             ; Restore left operand")
-        label_true = self.get_label("EQ_T")
-        label_end = self.get_label("EQ_E")
-        self.emit("    CMP $FE")
-        self.emit(f"    BEQ {label_true}")
-        self.emit("    LDA #0          ; Not equal")
-        self.emit(f"    JMP {label_end}")
-        self.emit(f"{label_true}:")
-        self.emit("    LDA #1          ; Equal")
-        self.emit(f"{label_end}:")
+        operand = self._restore_operands(operand)
+        self._gen_comparison(T.EQUAL, operand)
     
-    def _gen_not_equal(self):
+    def _gen_not_equal(self, operand: str | None = None):
         """
         Generate inequality comparison: left != right.
         
         Returns 1 if operands are not equal, 0 if equal.
-        Uses CMP instruction which sets flags based on subtraction.
+        EOR leaves zero only for equal operands, and CMP #1 turns that into the carry flag.
         
         Entry: A = right operand, stack = left operand
         Exit: A = 1 (not equal) or 0 (equal)
         """
-        self.emit("    STA $FE         ; Save right operand")
-        self.emit("    PLA             ; Restore left operand")
-        label_true = self.get_label("NE_T")
-        label_end = self.get_label("NE_E")
-        self.emit("    CMP $FE")
-        self.emit(f"    BNE {label_true}")
-        self.emit("    LDA #0          ; Equal")
-        self.emit(f"    JMP {label_end}")
-        self.emit(f"{label_true}:")
-        self.emit("    LDA #1          ; Not equal")
-        self.emit(f"{label_end}:")
+        operand = self._restore_operands(operand)
+        self._gen_comparison(T.NOT_EQUAL, operand)
     
     # ==================== Comparison Helpers ====================
     # These generate relational comparison operations (<, >, <=, >=).
     # Entry: A = right operand, stack = left operand
     # Exit: A = 1 (condition true) or 0 (condition false)
     #
-    # Uses CMP instruction which performs: left - right
-    # and sets processor flags based on result:
-    #   - Carry flag clear (BCC) means left < right
-    #   - Zero flag set (BEQ) means left == right
+    # No branches are used, the carry flag is rotated into A instead:
+    #   - CMP performs left - right, carry set means left >= right
+    #   - CLC, SBC performs left - right - 1, carry set means left > right
+    # The result is inverted with EOR #1 for < and <=.
+    
+    def _gen_comparison(self, sym_type: T, operand: str):
+        """
+        Emit the _COMPARE_SEQ sequence of a comparison operator.
+        
+        Entry: A = left operand, [operand] = right operand
+        Exit: A = 1 (condition true) or 0 (condition false)
+        """
+        template = _COMPARE_SEQ[sym_type]
+        # Comparing with zero needs no EOR, A itself is zero when they're equal
+        if operand == "#$00" and (sym_type == T.EQUAL or sym_type == T.NOT_EQUAL):
+            template = template[1:]
+        self.emit_with_operand(template, operand)
     
-    def _gen_less_than(self):
+    def _gen_less_than(self, operand: str | None = None):
         """
         Generate less than comparison: left < right.
         
-        Uses BCC (Branch if Carry Clear) after CMP.
-        CMP performs left - right and clears carry if result is negative (left < right).
+        CMP clears carry if left < right, the result is the inverted carry.
         
         Returns 1 if left < right, else 0.
         """
-        self.emit("    STA $FE         ; Save right operand")
-        self.emit("    PLA             ; Restore left operand")
-        label_true = self.get_label("LT_T")
-        label_end = self.get_label("LT_E")
-        self.emit("    CMP $FE         ; Compare left with right")
-        self.emit(f"    BCC {label_true}    ; Branch if left < right")
-        self.emit("    LDA #0          ; False")
-        self.emit(f"    JMP {label_end}")
-        self.emit(f"{label_true}:")
-        self.emit("    LDA #1          ; True")
-        self.emit(f"{label_end}:")
+        operand = self._restore_operands(operand)
+        self._gen_comparison(T.LESS_THAN, operand)
     
-    def _gen_less_than_equals(self):
+    def _gen_less_than_equals(self, operand: str | None = None):
         """
         Generate less than or equal: left <= right.
         
-        Combines BCC (less than) and BEQ (equal) checks.
+        left <= right is the opposite of left > right, so this is the inverted carry of CLC, SBC.
         Returns 1 if left <= right, else 0.
         """
-        self.emit("    STA $FE         ; Save right operand")
-        self.emit("    PLA             ; Restore left operand")
-        label_true = self.get_label("LE_T")
-        label_end = self.get_label("LE_E")
-        self.emit("    CMP $FE         ; Compare left with right")
-        self.emit(f"    BCC {label_true}    ; Branch if left < right")
-        self.emit(f"    BEQ {label_true}    ; Branch if left == right")
-        self.emit("    LDA #0          ; False")
-        self.emit(f"    JMP {label_end}")
-        self.emit(f"{label_true}:")
-        self.emit("    LDA #1          ; True")
-        self.emit(f"{label_end}:")
-    
-    def _gen_greater_than(self):
+        operand = self._restore_operands(operand)
+        self._gen_comparison(T.LESS_THAN_EQUALS, operand)
+    
+    def _gen_greater_than(self, operand: str | None = None):
         """
         Generate greater than comparison: left > right.
         
-        Returns false if equal or less than (using BEQ and BCC).
-        Otherwise returns true.
+        CLC, SBC computes left - right - 1, which only keeps carry set if left > right.
         Returns 1 if left > right, else 0.
         """
-        self.emit("    STA $FE         ; Save right operand")
-        self.emit("    PLA             ; Restore left operand")
-        label_false = self.get_label("GT_F")
-        label_end = self.get_label("GT_E")
-        self.emit("    CMP $FE         ; Compare left with right")
-        self.emit(f"    BEQ {label_false}     ; Equal, return 0")
-        self.emit(f"    BCC {label_false}     ; left < right, return 0")
-        self.emit("    LDA #1          ; left > right")
-        self.emit(f"    JMP {label_end}")
-        self.emit(f"{label_false}:")
-        self.emit("    LDA #0          ; Not greater")
-        self.emit(f"{label_end}:")
-    
-    def _gen_greater_than_equals(self):
+        operand = self._restore_operands(operand)
+        self._gen_comparison(T.GREATER_THAN, operand)
+    
+    def _gen_greater_than_equals(self, operand: str | None = None):
         """
         Generate greater than or equal: left >= right.
         
-        Uses BCC to check for less than. If not less than, then >= is true.
+        CMP sets carry if left >= right, the result is the carry.
         Returns 1 if left >= right, else 0.
         """
-        self.emit("    STA $FE         ; Save right operand")
-        self.emit("    PLA             ; Restore left operand")
-        label_false = self.get_label("GE_F")
-        label_end = self.get_label("GE_E")
-        self.emit("    CMP $FE         ; Compare left with right")
-        self.emit(f"    BCC {label_false}     ; left < right, return 0")
-        self.emit("    LDA #1          ; left >= right")
-        self.emit(f"    JMP {label_end}")
-        self.emit(f"{label_false}:")
-        self.emit("    LDA #0          ; Less than")
-        self.emit(f"{label_end}:")
+        operand = self._restore_operands(operand)
+        self._gen_comparison(T.GREATER_THAN_EQUALS, operand)
+    
+    # ==================== Peephole Optimization ====================
+    # Each operator and statement is generated on its own, so where their
+    # sequences meet there are instructions that can be left out or combined.
+    # The program body is rewritten in two passes:
+    #   1. Within runs of instructions with no label between them:
+    #      - CMP #0 before BEQ/BNE when the zero flag already comes from A
+    #      - LDA #0, ROL, [EOR #1], BEQ/BNE → a branch on the carry flag
+    #      - CMP #1, BCS/BCC → CMP #0, BNE/BEQ
+    #   2. Around jumps:
+    #      - Instructions after JMP/RTS/BRK that no label leads to
+    #      - JMP to a JMP → JMP to its target
+    #      - JMP to the label right after it
+    # The first pass only removes instructions that are followed by a branch,
+    # and the second only removes jumps and what follows them, so neither
+    # makes new patterns for the other.
+    # The value left in A is only given up when a branch on it follows,
+    # since generated code always loads A again after a conditional branch.
+    
+    def _peephole(self, lines: list[str]) -> list[str]:
+        """
+        Rewrite generated instruction patterns into shorter, faster ones.
+        
+        Args:
+            lines: Lines of assembly code of the program body
+            
+        Returns:
+            The rewritten lines
+        """
+        # Most lines appear many times, so each distinct line is split once
+        classified = {}
+        entries = []
+        for line in lines:
+            entry = classified.get(line)
+            if entry is None:
+                entry = classified[line] = self._classify_line(line)
+            entries.append(entry.copy())
+        
+        if not self._peephole_runs(entries) | self._peephole_jumps(entries):
+            return lines
+        return [entry[3] for entry in entries if entry[0] is not None]
+    
+    def _classify_line(self, line: str) -> list:
+        """
+        Split a line of generated assembly code for the peephole pass.
+        
+        Args:
+            line: Line of assembly code
+            
+        Returns:
+            [kind, mnemonic or label name, operand, line, comment], kind is None once the line is removed
+        """
+        if not line.startswith((" ", "\t")):
+            if not line or line.startswith(";"):
+                return [_LINE_OTHER, None, None, line, None]
+            return [_LINE_LABEL, line.split(";", 1)[0].strip().rstrip(":"), None, line, None]
+        
+        code, _, comment = line.partition(";")
+        parts = code.split()
+        if not parts:
+            return [_LINE_OTHER, None, None, line, None]
+        if parts[0] in _DIRECTIVES:
+            return [_LINE_DIRECTIVE, parts[0], None, line, None]
+        return [_LINE_INSTR, parts[0], parts[1] if len(parts) > 1 else "", line, comment.strip()]
+    
+    def _rewrite(self, entry: list, op: str, arg: str):
+        """
+        Replace the instruction of a peephole entry, keeping its comment.
+        
+        Args:
+            entry: Entry from _classify_line
+            op: New mnemonic
+            arg: New operand, or "" for none
+        """
+        code = f"    {op} {arg}" if arg else f"    {op}"
+        entry[1] = op
+        entry[2] = arg
+        entry[3] = f"{code:<19} ; {entry[4]}" if entry[4] else code
+    
+    def _sets_z_from_a(self, entry: list) -> bool:
+        """
+        Check that an instruction leaves the zero flag set exactly when A is zero.
+        
+        Args:
+            entry: Instruction entry from _classify_line
+            
+        Returns:
+            True if the zero flag comes from A after [entry]
+        """
+        op = entry[1]
+        return op in _SETS_Z_FROM_A or (op in _SHIFT_OPS and not entry[2])
+    
+    def _peephole_runs(self, entries: list) -> bool:
+        """
+        Apply the rules that match consecutive instructions.
+        
+        Runs of instructions are split by labels and directives, since
+        code that jumps to a label doesn't come from the instruction before it.
+        
+        Args:
+            entries: Entries from _classify_line, changed in place
+            
+        Returns:
+            True if anything was rewritten
+        """
+        changed = False
+        run = []
+        for entry in entries:
+            kind = entry[0]
+            if kind == _LINE_INSTR:
+                run.append(entry)
+            elif kind != _LINE_OTHER:
+                changed |= self._peephole_run(run)
+                run = []
+        changed |= self._peephole_run(run)
+        return changed
+    
+    def _peephole_run(self, run: list) -> bool:
+        """
+        Apply the rules that match consecutive instructions to one run.
+        
+        Args:
+            run: Instruction entries with no label or directive between them
+            
+        Returns:
+            True if anything was rewritten
+        """
+        changed = False
+        i = 0
+        while i < len(run) - 1:
+            entry = run[i]
+            op, arg = entry[1], entry[2]
+            next_op = run[i + 1][1]
+            
+            # ----- REDUNDANT CMP #0 -----
+            # Example: PLA, CMP #0, BEQ L → PLA, BEQ L
+            if op == "CMP" and arg == "#0" and next_op in ("BEQ", "BNE"):
+                j = i - 1
+                while j >= 0 and run[j][1] in _KEEPS_FLAGS:
+                    j -= 1
+                if j >= 0 and self._sets_z_from_a(run[j]):
+                    entry[0] = None
+                    del run[i]
+                    changed = True
+                    # The removed CMP may complete a pattern that started before it
+                    i = max(i - 3, 0)
+                    continue
+            
+            # ----- CMP #1 AS A ZERO TEST -----
+            # Carry set after CMP #1 means A isn't zero
+            # Example: CMP #1, BCS L → CMP #0, BNE L
+            if op == "CMP" and arg == "#1" and next_op in ("BCS", "BCC"):
+                self._rewrite(entry, "CMP", "#0")
+                self._rewrite(run[i + 1], "BNE" if next_op == "BCS" else "BEQ", run[i + 1][2])
+                changed = True
+                i = max(i - 1, 0)
+                continue
+            
+            # ----- BOOLEAN FROM CARRY, THEN BRANCH -----
+            # The 0/1 made from the carry flag is only tested, so the carry is branched on instead.
+            # A branch to one of zero_labels still needs A = 0 there, so its LDA #0 stays
+            # Example: CMP $10, LDA #0, ROL, EOR #1, BEQ L → CMP $10, BCS L
+            if op == "LDA" and arg == "#0" and next_op == "ROL" and not run[i + 1][2]:
+                j = i + 2
+                inverted = j < len(run) and run[j][1] == "EOR" and run[j][2] == "#1"
+                if inverted:
+                    j += 1
+                branch = run[j] if j < len(run) else None
+                start = i + 1 if branch is not None and branch[2] in self.zero_labels else i
+                if branch is not None and branch[1] in ("BEQ", "BNE") and (start == i or branch[1] == "BEQ"):
+                    self._rewrite(branch, _CARRY_BRANCH[(branch[1], inverted)], branch[2])
+                    for removed in run[start:j]:
+                        removed[0] = None
+                    del run[start:j]
+                    changed = True
+                    i = max(i - 1, 0)
+                    continue
+            
+            i += 1
+        return changed
+    
+    def _peephole_jumps(self, entries: list) -> bool:
+        """
+        Apply the rules about jumps and the code after them.
+        
+        Args:
+            entries: Entries from _classify_line, changed in place
+            
+        Returns:
+            True if anything was rewritten
+        """
+        changed = False
+        
+        # First instruction after each global label (local labels repeat between scopes)
+        label_target = {}
+        pending = []
+        for entry in entries:
+            kind = entry[0]
+            if kind == _LINE_LABEL:
+                if not entry[1].startswith("."):
+                    pending.append(entry[1])
+            elif kind == _LINE_INSTR:
+                for label in pending:
+                    label_target[label] = entry
+                pending = []
+            elif kind == _LINE_DIRECTIVE:
+                pending = []
+        
+        count = len(entries)
+        for i, entry in enumerate(entries):
+            if entry[0] != _LINE_INSTR or entry[1] not in _END_OPS:
+                continue
+            
+            # ----- UNREACHABLE CODE -----
+            # Nothing jumps into the middle of a run, so the rest of it never runs
+            j = i + 1
+            while j < count and entries[j][0] in (_LINE_INSTR, _LINE_OTHER, None):
+                if entries[j][0] == _LINE_INSTR:
+                    entries[j][0] = None
+                    changed = True
+                j += 1
+            
+            # ----- JUMP TO JUMP -----
+            # Example: JMP L1 ... L1: JMP L2 → JMP L2
+            if entry[1] == "JMP" and not entry[2].startswith("."):
+                seen = {entry[2]}
+                target = label_target.get(entry[2])
+                while (target is not None and target[0] == _LINE_INSTR and target[1] == "JMP"
+                       and not target[2].startswith(".") and target[2] not in seen):
+                    seen.add(target[2])
+                    self._rewrite(entry, "JMP", target[2])
+                    changed = True
+                    target = label_target.get(target[2])
+            
+            # ----- JUMP TO THE NEXT LABEL -----
+            # Example: JMP L, L: → L:
+            if entry[1] == "JMP":
+                j = i + 1
+                while j < count and entries[j][0] in (_LINE_OTHER, _LINE_LABEL, None):
+                    if entries[j][0] == _LINE_LABEL and entries[j][1] == entry[2]:
+                        entry[0] = None
+                        changed = True
+                        break
+                    j += 1
+        
+        return changed
     
     # ==================== I/O Routines ====================
     # These methods generate input/output subroutines appended to the program.
@@ -1120,8 +2410,7 @@ class CodeGenerator:
         - 'py65mon': Uses memory-mapped console I/O at $F001/$F004
         - 'generic': Placeholder using example memory-mapped addresses
         """
-        self.emit("; ==================== I/O Routines ====================")
-        self.emit("")
+        self.emit(_IO_HEADER)
         
         if self.target == 'py65mon':
             self._gen_py65mon_io()
@@ -1138,20 +2427,7 @@ class CodeGenerator:
         
         To port to a new platform, replace $D010/$D012 with actual I/O addresses.
         """
-        self.emit("output_routine:")
-        self.emit("    ; Output value in A to screen/console")
-        self.emit("    ; For 6502, this is system-dependent")
-        self.emit("    ; Here we write to memory-mapped I/O at $D012 (example)")
-        self.emit("    STA $D012       ; Write to output port")
-        self.emit("    RTS")
-        self.emit("")
-        self.emit("input_routine:")
-        self.emit("    ; Read input value into A")
-        self.emit("    ; For 6502, this is system-dependent")
-        self.emit("    ; Here we read from memory-mapped I/O at $D010 (example)")
-        self.emit("    LDA $D010       ; Read from input port")
-        self.emit("    RTS")
-        self.emit("")
+        self.emit(_GENERIC_IO)
     
     def _gen_py65mon_io(self):
         """
@@ -1171,127 +2447,7 @@ class CodeGenerator:
         - $FD: Leading zero suppression flag
         - $FE: Temporary digit storage
         """
-        self.emit("; Target: py65mon emulator")
-        self.emit("; Console output at $F001, blocking input at $F005")
-        self.emit("")
-        self.emit("output_routine:")
-        self.emit("    ; Output value in A as decimal number (0-255)")
-        self.emit("    ; Uses zero-page $FB-$FD for temporary storage")
-        self.emit("    ; Algorithm: Repeatedly divide by 100, 10 to extract digits")
-        self.emit("    ; Suppresses leading zeros (e.g., 5 prints as '5' not '005')")
-        self.emit("    STA $FB          ; Store number to output")
-        self.emit("    LDA #1")
-        self.emit("    STA $FD          ; Start suppressing leading zeros")
-        self.emit("")
-        self.emit("    ; ===== Output hundreds digit =====")
-        self.emit("    ; Extract hundreds by repeated subtraction")
-        self.emit("    ; Example: 234 → subtract 100 twice → hundreds = 2")
-        self.emit("    LDA $FB")
-        self.emit("    LDX #0           ; X will count hundreds")
-        self.emit("output_hundreds:")
-        self.emit("    CMP #100")
-        self.emit("    BCC output_hundreds_done")
-        self.emit("    SBC #100         ; Subtract 100 (carry is set)")
-        self.emit("    INX")
-        self.emit("    JMP output_hundreds")
-        self.emit("output_hundreds_done:")
-        self.emit("    STA $FB          ; Save remainder")
-        self.emit("    TXA")
-        self.emit("    BEQ skip_hundreds ; Skip if zero (suppress leading zero)")
-        self.emit("    LDA #0")
-        self.emit("    STA $FD          ; Found non-zero, stop suppressing")
-        self.emit("    TXA")
-        self.emit("    CLC")
-        self.emit("    ADC #48          ; Convert to ASCII ('0' = 48)")
-        self.emit("    STA $F001        ; Output hundreds digit")
-        self.emit("skip_hundreds:")
-        self.emit("")
-        self.emit("    ; ===== Output tens digit =====")
-        self.emit("    ; Extract tens from remainder by repeated subtraction")
-        self.emit("    LDA $FB")
-        self.emit("    LDX #0           ; X will count tens")
-        self.emit("output_tens:")
-        self.emit("    CMP #10")
-        self.emit("    BCC output_tens_done")
-        self.emit("    SBC #10          ; Subtract 10 (carry is set)")
-        self.emit("    INX")
-        self.emit("    JMP output_tens")
-        self.emit("output_tens_done:")
-        self.emit("    STA $FB          ; Save remainder (ones digit)")
-        self.emit("    TXA")
-        self.emit("    BNE print_tens   ; Print if non-zero")
-        self.emit("    LDA $FD")
-        self.emit("    BNE skip_tens    ; Skip if still suppressing zeros")
-        self.emit("print_tens:")
-        self.emit("    LDA #0")
-        self.emit("    STA $FD          ; Stop suppressing")
-        self.emit("    TXA")
-        self.emit("    CLC")
-        self.emit("    ADC #48          ; Convert to ASCII")
-        self.emit("    STA $F001        ; Output tens digit")
-        self.emit("skip_tens:")
-        self.emit("")
-        self.emit("    ; ===== Output ones digit =====")
-        self.emit("    ; Always output ones digit, even if zero (e.g., for '0', '10', '100')")
-        self.emit("    LDA $FB")
-        self.emit("    CLC")
-        self.emit("    ADC #48          ; Convert to ASCII")
-        self.emit("    STA $F001        ; Output ones digit")
-        self.emit("")
-        self.emit("    ; Output newline for readability")
-        self.emit("    LDA #10")
-        self.emit("    STA $F001")
-        self.emit("    RTS")
-        self.emit("")
-        self.emit("input_routine:")
-        self.emit("    ; Read multi-digit number from console until Enter")
-        self.emit("    ; Reads ASCII digits and converts to binary (0-255 max)")
-        self.emit("    ; Uses zero-page $FA for accumulating result")
-        self.emit("    ; Algorithm: For each digit, multiply result by 10 and add digit")
-        self.emit("    ; Example: '123' → 0*10+1=1, 1*10+2=12, 12*10+3=123")
-        self.emit("    LDA #0")
-        self.emit("    STA $FA         ; Initialize result to 0")
-        self.emit("")
-        self.emit("input_loop:")
-        self.emit("    ; ===== Wait for next character =====")
-        self.emit("input_wait:")
-        self.emit("    LDA $F004       ; Poll for input (non-blocking)")
-        self.emit("    BEQ input_wait  ; Keep waiting if no key pressed")
-        self.emit("")
-        self.emit("    ; ===== Check for Enter key =====")
-        self.emit("    ; Enter terminates input")
-        self.emit("    CMP #10")
-        self.emit("    BEQ input_done  ; If Enter (LF), we're done")
-        self.emit("    CMP #13")
-        self.emit("    BEQ input_done  ; If Enter (CR), we're done")
-        self.emit("")
-        self.emit("    ; ===== Convert ASCII digit to number =====")
-        self.emit("    ; ASCII '0'-'9' are 48-57, so subtract 48")
-        self.emit("    SEC")
-        self.emit("    SBC #48")
-        self.emit("    STA $FE         ; Store new digit in $FE")
-        self.emit("")
-        self.emit("    ; ===== Multiply current result by 10 =====")
-        self.emit("    ; Uses bit shifts: result * 10 = (result * 2 * 5) = (result << 1) * 5")
-        self.emit("    ; And: result * 5 = (result << 2) + result")
-        self.emit("    ; Combined: result * 10 = ((result << 2) + result) << 1")
-        self.emit("    LDA $FA         ; Load current result")
-        self.emit("    STA $FD         ; Save copy")
-        self.emit("    ASL             ; result * 2")
-        self.emit("    ASL             ; result * 4")
-        self.emit("    CLC")
-        self.emit("    ADC $FD         ; result * 4 + result * 1 = result * 5")
-        self.emit("    ASL             ; result * 10")
-        self.emit("    CLC")
-        self.emit("    ADC $FE         ; Add new digit")
-        self.emit("    STA $FA         ; Store updated result")
-        self.emit("")
-        self.emit("    JMP input_loop  ; Read next character")
-        self.emit("")
-        self.emit("input_done:")
-        self.emit("    LDA $FA         ; Load final result into A")
-        self.emit("    RTS")
-        self.emit("")
+        self.emit(_PY65MON_IO)
     
 
 
@@ -1,26 +1,33 @@
 from enum import Enum
+from array import array
 
 '''
     Abstract enum class that represents a symbol type (terminal or non-terminal).
-    Contains a [val], and a [is_terminal] flag.
+    Contains a [val], a [is_terminal] flag, and a [precedence] (-1 if symbols of this type aren't operators).
     Inherit this class to create new symbol types.
+    Members are singletons compared by identity, so they hash by identity too, instead of Enum's hash of the member's name
 '''
 class SymbolType(Enum):
     def __init__(self, val, is_terminal: bool):
         self.val = val
         self.is_terminal = is_terminal
+        self.precedence = -1
+
+    __hash__ = object.__hash__
 
 '''
     Abstract class that represents a terminal or non-terminal symbol.
-    Contains a [type], and an optional [value]
+    Contains a [type], and an optional [value]. A symbol's precedence is the same as its type's, so only the type holds it
     Tnherit this class to define new symbols in a grammer.
 '''
 class Symbol:
+    __slots__ = ("type",)
+
     def __init__(self, type: SymbolType) -> None:
         self.type = type
 
     def __eq__(self, other: Symbol) -> bool:
-        return self.type == other.type
+        return self is other or self.type is other.type
     
     def __hash__(self):
         return hash(self.type)
@@ -28,21 +35,42 @@ class Symbol:
     def __repr__(self) -> str:
         return self.type.name
 
+'''
+    Packs a [symbol_type] into a small integer: its position within its enum,
+    positive for terminal symbol types and negative for non-terminal ones.
+'''
+def _symbol_code(symbol_type: SymbolType) -> int:
+    index = list(type(symbol_type)).index(symbol_type) + 1
+    return index if symbol_type.is_terminal else -index
+
 '''
     Class representing a production rule for a reguler or context-free grammer.
     A single non-terminal symbol [nterm] transforms into a sequence of terminal and/or non-terminal symbols [result].
+    The rule is also kept as a packed array of symbol codes [codes], which is what rules are compared and hashed by.
 '''
 class GrammerRule:
+    __slots__ = ("nterm_type", "result", "codes", "_hash", "_repr")
+
     def __init__(self, nterm_type: SymbolType, result: list[SymbolType] | None) -> None:
         if nterm_type.is_terminal:
             raise ValueError("nterm_type value of GrammerRule must be a non-terminal symbol type!")
         self.nterm_type = nterm_type
-        self.result = result
+        self.result = tuple(result) if result is not None else None
+        self.codes = array('i', [_symbol_code(nterm_type)] + [_symbol_code(r) for r in result or ()])
+        self._hash = hash(self.codes.tobytes() if result is not None else _symbol_code(nterm_type))
+        self._repr = None
         
     def __eq__(self, other: GrammerRule) -> bool:
-        return self.nterm_type == other.nterm_type and self.result == other.result
+        return self is other or self._hash == other._hash and self.codes == other.codes and (self.result is None) == (other.result is None)
+
+    def __hash__(self):
+        return self._hash
     
+    # Rules never change, so the string is built on first use and reused by later traces
     def __repr__(self) -> str:
-        if self.result is None:
-            return f"{self.nterm_type.name}->E"
-        return f"{self.nterm_type}->" + " ".join(r.name for r in self.result)
\ No newline at end of file
+        if self._repr is None:
+            if self.result is None:
+                self._repr = f"{self.nterm_type.name}->E"
+            else:
+                self._repr = f"{self.nterm_type}->" + " ".join(r.name for r in self.result)
+        return self._repr
\ No newline at end of file
@@ -1,4 +1,5 @@
-from shared.tok import Token, TokenType
+from shared.tok import Token, TokenType, SINGLETON_TOKENS, BYTE_LITERAL_TOKENS
+import re
 
 class LexerError(Exception):
     """Exception raised for lexical analysis errors"""
@@ -8,19 +9,64 @@ class LexerError(Exception):
         self.column = column
         super().__init__(f"Lexer Error at line {line}, column {column}: {message}")
 
+def _operator_pattern(lexemes) -> str:
+    """
+    Build the regex alternation that matches any of the given operator lexemes, each one or two characters long.
+    Lexemes are grouped by their first character, each group is one alternative with its possible second characters.
+    
+    Args:
+        lexemes: The operator and punctuation lexemes
+    
+    Returns:
+        The alternation, starting with one character class for the first characters that are never followed by another
+    
+    Raises:
+        ValueError: If a lexeme is longer than two characters
+    """
+    seconds = {}
+    for lexeme in lexemes:
+        if not 1 <= len(lexeme) <= 2:
+            raise ValueError(f"Operator {lexeme!r} isn't one or two characters long!")
+        seconds.setdefault(lexeme[0], set()).add(lexeme[1:])
+    
+    single = "".join(re.escape(first) for first, following in seconds.items() if following == {""})
+    alternatives = [f"[{single}]"] if single else []
+    for first, following in seconds.items():
+        pairs = sorted(following - {""})
+        if pairs:
+            second = re.escape(pairs[0]) if len(pairs) == 1 else f"[{''.join(re.escape(c) for c in pairs)}]"
+            alternatives.append(re.escape(first) + second + ("?" if "" in following else ""))
+    return " | ".join(alternatives)
+
 class Lexer:
     """
     Lexical analyzer that converts source code into a stream of tokens.
     """
     
-    # Keywords mapping for quick lookup
-    KEYWORDS = {
-        "var": TokenType.VAR,
-        "if": TokenType.IF,
-        "else": TokenType.ELSE,
-        "while": TokenType.WHILE,
-        "do": TokenType.DO,
-    }
+    # Every token type with a fixed lexeme is a keyword if its lexeme is a word, and an operator or punctuation otherwise
+    KEYWORDS = {t.val: t for t in TokenType if isinstance(t.val, str) and t.val.isidentifier()}
+    OPERATORS = {t.val: t for t in TokenType if isinstance(t.val, str) and not t.val.isidentifier()}
+    
+    # Keywords and operators have no value, so each lexeme maps straight to its shared Token
+    KEYWORD_TOKENS = {text: SINGLETON_TOKENS[token_type] for text, token_type in KEYWORDS.items()}
+    OPERATOR_TOKENS = {text: SINGLETON_TOKENS[token_type] for text, token_type in OPERATORS.items()}
+    
+    # Every token in one pattern, compiled once. Operators get one alternative per first character, so the regex engine skips
+    # the others after a single character compare, and an optional second character lets the longer operator win.
+    # Whitespace and comments before a token are part of its match, so every match is a token,
+    # except for \Z after whitespace or comments at the end of the source, which matches no group.
+    # A multi-line comment is matched as runs of characters other than '*' and runs of '*', instead of one character at a time
+    TOKEN_PATTERN = re.compile(rf"""
+        (?: [ \t\n\r]+ | //[^\n]* | /\*[^*]*\*+(?:[^/*][^*]*\*+)*/ )*     # Whitespace, single-line and multi-line comments
+        (?:
+          (?P<UNTERMINATED>/\*)                            # Multi-line comment without an end
+        | (?P<ID>[^\W\d]\w*)                               # Identifiers and keywords
+        | (?P<NUMBER>\d+)                                   # Numeric literals
+        | (?P<OPERATOR>{_operator_pattern(OPERATORS)})
+        | (?P<ERROR>.)                                      # Anything else is an unexpected character
+        | \Z
+        )
+    """, re.VERBOSE | re.DOTALL)
     
     def __init__(self, source: str):
         """
@@ -35,116 +81,26 @@ class Lexer:
         self.column = 1     # Current column number
         self.tokens = []    # List of generated tokens
     
-    def current_char(self) -> str | None:
-        """Return the current character without advancing, or None if at end"""
-        if self.pos >= len(self.source):
-            return None
-        return self.source[self.pos]
-    
-    def peek(self, offset: int = 1) -> str | None:
+    def _position(self, pos: int) -> tuple[int, int]:
         """
-        Look ahead at a character without consuming it.
+        Find the line and column of a position in the source.
+        Only needed for error reporting, so it isn't tracked while scanning.
         
         Args:
-            offset: How many characters ahead to peek (default 1)
+            pos: Index into the source string
         
         Returns:
-            The character at pos+offset, or None if beyond end
+            The (line, column) pair, both starting at 1
         """
-        peek_pos = self.pos + offset
-        if peek_pos >= len(self.source):
-            return None
-        return self.source[peek_pos]
-    
-    def advance(self) -> str | None:
-        """
-        Consume and return the current character, advancing position.
-        Updates line and column tracking.
-        """
-        if self.pos >= len(self.source):
-            return None
-        
-        char = self.source[self.pos]
-        self.pos += 1
-        
-        if char == '\n':
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
-        
-        return char
-    
-    def skip_whitespace(self):
-        """Skip whitespace characters (space, tab, newline, carriage return)"""
-        while self.current_char() and self.current_char() in ' \t\n\r':
-            self.advance()
-    
-    def skip_comment(self):
-        """
-        Skip single-line comments (// ...) and multi-line comments (/* ... */)
-        Returns True if a comment was skipped, False otherwise
-        """
-        if self.current_char() == '/' and self.peek() == '/':
-            # Single-line comment
-            while self.current_char() and self.current_char() != '\n':
-                self.advance()
-            return True
-        
-        elif self.current_char() == '/' and self.peek() == '*':
-            # Multi-line comment
-            start_line = self.line
-            self.advance()  # consume '/'
-            self.advance()  # consume '*'
-            
-            while True:
-                if self.current_char() is None:
-                    raise LexerError(f"Unterminated comment starting at line {start_line}", 
-                                   self.line, self.column)
-                
-                if self.current_char() == '*' and self.peek() == '/':
-                    self.advance()  # consume '*'
-                    self.advance()  # consume '/'
-                    break
-                
-                self.advance()
-            
-            return True
-        
-        return False
-    
-    def read_identifier(self) -> str:
-        """
-        Read an identifier or keyword.
-        Identifiers start with a letter or underscore, followed by letters, digits, or underscores.
-        """
-        start_pos = self.pos
-        
-        # First character must be letter or underscore
-        if not (self.current_char().isalpha() or self.current_char() == '_'):
-            raise LexerError(f"Invalid identifier start: '{self.current_char()}'", 
-                           self.line, self.column)
-        
-        while self.current_char() and (self.current_char().isalnum() or self.current_char() == '_'):
-            self.advance()
-        
-        return self.source[start_pos:self.pos]
-    
-    def read_number(self) -> int:
-        """
-        Read a numeric literal (integer).
-        Supports decimal numbers.
-        """
-        start_pos = self.pos
-        
-        while self.current_char() and self.current_char().isdigit():
-            self.advance()
-        
-        return int(self.source[start_pos:self.pos])
+        line = self.source.count('\n', 0, pos) + 1
+        column = pos - self.source.rfind('\n', 0, pos)
+        return line, column
     
     def tokenize(self) -> list[Token]:
         """
         Main method to tokenize the entire source code.
+        The whole source is scanned once by TOKEN_PATTERN, each match's group tells what kind of token it is.
+        Positions come from the group, since a match also covers the whitespace and comments before it.
         
         Returns:
             List of Token objects
@@ -153,147 +109,57 @@ class Lexer:
             LexerError: If invalid characters or malformed tokens are encountered
         """
         self.tokens = []
-        
-        while self.pos < len(self.source):
-            # Skip whitespace and comments
-            self.skip_whitespace()
-            
-            if self.current_char() is None:
+        # Everything used for each token is bound to a local once, instead of looked up per token
+        append = self.tokens.append
+        # Every word seen so far mapped to its token, starting with the keywords. Tokens never change, so each name only needs one
+        words = dict(self.KEYWORD_TOKENS)
+        operators = self.OPERATOR_TOKENS
+        token = Token
+        id_type = TokenType.ID
+        literal_type = TokenType.LITERAL
+        byte_literals = BYTE_LITERAL_TOKENS
+        
+        for match in self.TOKEN_PATTERN.finditer(self.source):
+            kind = match.lastgroup
+            
+            # Only whitespace or comments were left
+            if kind is None:
                 break
             
-            if self.skip_comment():
-                continue
-            
-            # Save position for error reporting
-            token_line = self.line
-            token_column = self.column
-            char = self.current_char()
+            text = match[kind]
             
             # Identifiers and keywords
-            if char.isalpha() or char == '_':
-                identifier = self.read_identifier()
-                # Check if it's a keyword
-                if identifier in self.KEYWORDS:
-                    self.tokens.append(Token(self.KEYWORDS[identifier]))
-                else:
-                    self.tokens.append(Token(TokenType.ID, identifier))
+            if kind == 'ID':
+                # A single lookup finds a keyword's token, or the token of an identifier that was already seen
+                word = words.get(text)
+                if word is None:
+                    # \w also matches numeric characters that aren't letters, which can't start an identifier
+                    if not text.isascii() and not (text[0].isalpha() or text[0] == '_'):
+                        line, column = self._position(match.start(kind))
+                        raise LexerError(f"Unexpected character: '{text[0]}'", line, column)
+                    word = words[text] = token(id_type, text)
+                append(word)
+            
+            # Operators and punctuation
+            elif kind == 'OPERATOR':
+                append(operators[text])
             
             # Numeric literals
-            elif char.isdigit():
-                number = self.read_number()
-                self.tokens.append(Token(TokenType.LITERAL, number))
-            
-            # Operators and punctuation (multi-character operators first!)
-            elif char == '+':
-                self.advance()
-                if self.current_char() == '+':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.INCREMENT))
-                else:
-                    self.tokens.append(Token(TokenType.PLUS))
-            
-            elif char == '-':
-                self.advance()
-                if self.current_char() == '-':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.DECREMENT))
-                else:
-                    self.tokens.append(Token(TokenType.MINUS))
-            
-            elif char == '&':
-                self.advance()
-                if self.current_char() == '&':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.LOGIC_AND))
-                else:
-                    self.tokens.append(Token(TokenType.BIT_AND))
-            
-            elif char == '|':
-                self.advance()
-                if self.current_char() == '|':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.LOGIC_OR))
-                else:
-                    self.tokens.append(Token(TokenType.BIT_OR))
-            
-            elif char == '^':
-                self.advance()
-                if self.current_char() == '^':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.LOGIC_XOR))
-                else:
-                    self.tokens.append(Token(TokenType.BIT_XOR))
-            
-            elif char == '<':
-                self.advance()
-                if self.current_char() == '<':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.SHIFT_LEFT))
-                elif self.current_char() == '=':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.LESS_THAN_EQUALS))
-                else:
-                    self.tokens.append(Token(TokenType.LESS_THAN))
-            
-            elif char == '>':
-                self.advance()
-                if self.current_char() == '>':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.SHIFT_RIGHT))
-                elif self.current_char() == '=':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.GREATER_THAN_EQUALS))
-                else:
-                    self.tokens.append(Token(TokenType.GREATER_THAN))
-            
-            elif char == '=':
-                self.advance()
-                if self.current_char() == '=':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.EQUAL))
-                else:
-                    self.tokens.append(Token(TokenType.ASSIGN))
-            
-            elif char == '!':
-                self.advance()
-                if self.current_char() == '=':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.NOT_EQUAL))
-                else:
-                    self.tokens.append(Token(TokenType.LOGIC_NOT))
-            
-            # Single-character tokens
-            elif char == '~':
-                self.advance()
-                self.tokens.append(Token(TokenType.BIT_NOT))
-            
-            elif char == '(':
-                self.advance()
-                self.tokens.append(Token(TokenType.OPEN_BRACE))
-            
-            elif char == ')':
-                self.advance()
-                self.tokens.append(Token(TokenType.CLOSE_BRACE))
-            
-            elif char == '{':
-                self.advance()
-                self.tokens.append(Token(TokenType.OPEN_CURLY))
-            
-            elif char == '}':
-                self.advance()
-                self.tokens.append(Token(TokenType.CLOSE_CURLY))
-            
-            elif char == ';':
-                self.advance()
-                self.tokens.append(Token(TokenType.SEMICOLON))
+            elif kind == 'NUMBER':
+                value = int(text)
+                append(byte_literals[value] if value < 0x100 else token(literal_type, value))
             
-            elif char == ',':
-                self.advance()
-                self.tokens.append(Token(TokenType.COMMA))
+            elif kind == 'UNTERMINATED':
+                start_line, _ = self._position(match.start(kind))
+                line, column = self._position(len(self.source))
+                raise LexerError(f"Unterminated comment starting at line {start_line}", line, column)
             
             else:
-                raise LexerError(f"Unexpected character: '{char}'", token_line, token_column)
+                line, column = self._position(match.start(kind))
+                raise LexerError(f"Unexpected character: '{text}'", line, column)
         
+        self.pos = len(self.source)
+        self.line, self.column = self._position(self.pos)
         return self.tokens
     
     def __repr__(self) -> str:
@@ -3,6 +3,7 @@ from shared.grammer import SymbolType, Symbol
 '''
     Enum class representing all tokens within the language.
     The [value] is the token's lexeme (or an integer if it doesn't have one), and the [is_terminal] flag is always True
+    Operators also have a [precedence] (lower binds weaker), every other token has -1
 '''
 class TokenType(SymbolType):
     VAR = ("var")
@@ -40,21 +41,58 @@ class TokenType(SymbolType):
     EQUAL = ("==", 1)
     NOT_EQUAL = ("!=", 1)
 
-    def __init__(self, value, precedence = None):
+    def __init__(self, value, precedence = -1):
         super().__init__(value, True)
         self.precedence = precedence
 
+'''
+    Identifier names interned to small integer ids, so symbol tables can hold ints instead of Tokens.
+    [_NAMES] keeps the first string seen for each id, so every token of a name shares one string.
+'''
+_INTERN: dict[str, int] = {}
+_NAMES: list[str] = []
+
+def intern_name(name: str) -> int:
+    name_id = _INTERN.get(name)
+    if name_id is None:
+        name_id = _INTERN[name] = len(_NAMES)
+        _NAMES.append(name)
+    return name_id
+
+'''
+    Class representing a token produced by the lexer.
+    ID tokens carry the interned id of their name in [name_id], every other token has -1
+'''
 class Token(Symbol):
+    __slots__ = ("value", "name_id")
+
     def __init__(self, type: TokenType, value = None):
-        self.value = value
-        self.precedence = type.precedence
         super().__init__(type)
+        if type == TokenType.ID:
+            self.name_id = intern_name(value)
+            self.value = _NAMES[self.name_id]
+        else:
+            self.name_id = -1
+            self.value = value
 
     def __eq__(self, other: Symbol) -> bool:
-        return self.type == other.type and self.value == other.value
+        return self is other or self.type is other.type and self.value == other.value
     
     def __repr__(self) -> str:
         return self.type.name if self.value is None else f"{self.type.name}({repr(self.value)})"
     
     def __hash__(self):
-        return hash(self.type) + hash(self.value)
\ No newline at end of file
+        return hash(self.type) + hash(self.value)
+'''
+    One shared Token for each token type without a value (keywords, operators and punctuation).
+    The lexer hands these out instead of creating a new Token for every occurrence, tokens are never changed once created
+'''
+SINGLETON_TOKENS: dict[TokenType, Token] = {
+    token_type: Token(token_type) for token_type in TokenType if token_type not in (TokenType.ID, TokenType.LITERAL)
+}
+
+'''
+    One shared Token for each literal that fits in a byte, since most literals in a program are small.
+    The lexer and constant folding both hand these out instead of creating a new Token each time
+'''
+BYTE_LITERAL_TOKENS: tuple[Token, ...] = tuple(Token(TokenType.LITERAL, value) for value in range(0x100))
@@ -3,17 +3,41 @@ from shared.grammer import Symbol
 '''
     Class representing an tree
     Each instance is a node, containing a [symbol], and optionally leaf [nodes].
-    Leaf nodes are stored in a list, where the first node is the leftmost, and the last is the rightmost in the tree.
+    Child nodes are stored in a list, where the first node is the leftmost, and the last is the rightmost in the tree.
+    Leaves all share one empty tuple instead of each getting an empty list, a node that gains children is given a new list.
+    Operator nodes also carry their own [precedence] and [brace_depth], so building an AST never changes the shared symbol.
+    Parse tree nodes know their interned [shape], which is -1 once the node has been restructured (or was never interned).
+    [needs_check] is False when the parsed subtree has no identifier or expression, so semantic analysis can skip it.
 '''
 class Tree:
-    def __init__(self, symbol : Symbol, nodes : list[Tree] | None = None) -> None:
+    __slots__ = ("symbol", "nodes", "precedence", "brace_depth", "shape", "needs_check")
+
+    def __init__(self, symbol : Symbol, nodes : list[Tree] | tuple = ()) -> None:
         self.symbol = symbol
-        self.nodes = nodes if nodes is not None else []
+        self.nodes = nodes
+        self.precedence = symbol.type.precedence
+        self.brace_depth = 0
+        self.shape = -1
+        self.needs_check = True
 
     # def __eq__(self, other : Tree) -> bool:
     #     return self.symbol == other.symbol and self.nodes == other.nodes
     
     def __repr__(self) -> str:
-        if not self.nodes:
-            return repr(self.symbol)
-        return f"({repr(self.symbol)} {' '.join(repr(n) for n in self.nodes)})"
\ No newline at end of file
+        # Built with an explicit stack and joined once, so deep trees neither recurse nor copy their text per level.
+        # Strings on the stack are separators and closing brackets, written out as they're popped
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if type(node) is str:
+                parts.append(node)
+            elif node is None or not node.nodes:
+                parts.append(repr(node if node is None else node.symbol))
+            else:
+                parts.append(f"({repr(node.symbol)}")
+                stack.append(")")
+                for child in reversed(node.nodes):
+                    stack.append(child)
+                    stack.append(" ")
+        return "".join(parts)
\ No newline at end of file
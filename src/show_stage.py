@@ -1,72 +1,10 @@
-from shared.lexer import Lexer, LexerError
+from main import tokenize_from_file
 from syntax.parser import parse
 from semantics.sem import check_semantics
 from shared.code_generator import generate_code
-import sys
 import argparse
 import os
 
-# Increase recursion limit for parsing larger programs
-# Default is 1000, which is insufficient for programs with many statements
-sys.setrecursionlimit(5000)
-
-def tokenize_from_file(filepath: str):
-    """
-    Read source code from a file and tokenize it.
-    
-    Args:
-        filepath: Path to the source code file
-    """
-    try:
-        # Read the file contents
-        with open(filepath, 'r', encoding='utf-8') as file:
-            source_code = file.read()
-        
-        # Create lexer and tokenize
-        lexer = Lexer(source_code)
-        tokens = lexer.tokenize()
-        
-        return tokens
-        
-    except FileNotFoundError:
-        print(f"Error: File '{filepath}' not found!")
-        return None
-    except PermissionError:
-        print(f"Error: Permission denied reading '{filepath}'!")
-        return None
-    except LexerError as e:
-        print(f"Lexer Error: {e}")
-        return None
-    except Exception as e:
-        print(f"Unexpected error: {e}")
-        return None
-
-def tokenize_from_string(source_code: str):
-    """
-    Tokenize source code from a string.
-    
-    Args:
-        source_code: The source code string
-    """
-    try:
-        # Create lexer instance and tokenize
-        lexer = Lexer(source_code)
-        tokens = lexer.tokenize()
-        
-        # Print the tokens
-        print(f"Successfully tokenized {len(tokens)} tokens:\n")
-        for i, token in enumerate(tokens, 1):
-            print(f"{i:3d}. {token}")
-        
-        return tokens
-        
-    except LexerError as e:
-        print(f"Lexer Error: {e}")
-        return None
-    except Exception as e:
-        print(f"Unexpected error: {e}")
-        return None
-
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(
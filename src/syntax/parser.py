@@ -1,7 +1,8 @@
 from syntax.grammer_def import N, grammer
 from shared.tree import Tree
 from shared.tok import Token, TokenType as T
-from shared.grammer import Symbol
+from shared.grammer import Symbol, GrammerRule
+from functools import cache
 
 '''
     Parsing function for analysing the syntactic structure of a sequence of tokens, based on the grammer.
@@ -13,72 +14,132 @@ from shared.grammer import Symbol
     Returns a parse tree on success, or None if the sequence of tokens doesn't follow the grammer.
 '''
 def parse(tokens: list[Token]) -> Tree | None:
-    tree = Tree(Symbol(N.STATEMENT_LIST))
-    if _build_tree(tree, tokens, 0) == None:
+    tree = Tree(_NTERM_SYMBOLS[N.STATEMENT_LIST], [])
+    # Rules are chosen and matched by token type alone, so the types are read out once. Two Nones past the end stand for no token
+    token_types = [token.type for token in tokens]
+    token_types += (None, None)
+    if _build_tree(tree, tokens, token_types, 0) is None:
         return None
     else:
         return tree
 
 '''
-    Recursive function for building a parse tree from a sequence of tokens.
-    Returns None if not successful.
+    One shared Symbol for each non-terminal type, since a non-terminal symbol carries nothing but its type.
+    Symbols are never changed once created, passes that restructure the tree replace a node's symbol instead.
 '''
-def _build_tree(tree: Tree, tokens: list[Token], t_idx: int):
-    # Go through all of the rules, check only the ones with a matching nterm
-    # TODO : Go through the rules with terminal symbols first, then the ones with non-terminals
-    for rule in grammer:
-        if rule.nterm_type != tree.symbol.type:
-            continue
+_NTERM_SYMBOLS = {nterm_type: Symbol(nterm_type) for nterm_type in N}
+
+'''
+    Rules of the grammer grouped by the non-terminal they expand, kept in grammer order.
+'''
+_RULES_BY_NTERM = {}
+for _rule in grammer:
+    _RULES_BY_NTERM.setdefault(_rule.nterm_type, []).append(_rule)
 
+'''
+    Picks the rule that expands [nterm_type] when the next two tokens are of types [type0] and [type1] (None if there are no tokens left).
+    The first rule whose terminal symbols among its first two match is picked, an epsilon rule always matches.
+    Since the choice depends on nothing else, each entry of this LL(2) parse table is worked out once and cached.
+    Returns None if no rule fits.
+'''
+@cache
+def _select_rule(nterm_type: N, type0: T | None, type1: T | None) -> GrammerRule | None:
+    for rule in _RULES_BY_NTERM.get(nterm_type, ()):
         result = rule.result
 
-        # If it reaches an epsilon rule, return t_idx without incrementing
-        if result == None:
-            return t_idx
+        # Epsilon rule
+        if result is None:
+            return rule
 
-        # Peek the next 2 symbols.
-        # If there are no symbols left, or the symbol is terminal and doesn't match the rule, continue (try the next rule)
+        # If there are no symbols left, or the symbol is terminal and doesn't match the rule, try the next rule
         if len(result) > 0:
-            peek = _peek(tokens, t_idx, 0)
-            if peek is None:
+            if type0 is None:
                 continue
-            elif result[0] in T and result[0] != peek.type:
+            elif result[0].is_terminal and result[0] is not type0:
                 continue
         if len(result) > 1:
-            peek = _peek(tokens, t_idx, 1)
-            if peek is None:
+            if type1 is None:
                 continue
-            elif result[1] in T and result[1] != peek.type:
+            elif result[1].is_terminal and result[1] is not type1:
                 continue
 
-        # If the rule fits
-        for rule_sym_type in result:
-            peek = _peek(tokens, t_idx, 0)
+        return rule
+    return None
+
+'''
+    Builds a parse tree below [tree] from the sequence of tokens, starting at token [t_idx].
+    [token_types] holds the type of each token, followed by two Nones, so looking two tokens ahead never needs a bounds check.
+    Works through an explicit stack instead of recursing, each entry is a non-terminal being expanded (its type and children),
+    the symbols of the rule it was expanded with, and the index of the next of those symbols to handle.
+    A non-terminal only becomes a Tree node once it's finished and kept, most of them are replaced by their only child.
+    Each node's structure is interned to a small integer id (hash-consing), so structurally identical subtrees get equal shapes.
+    A shape's key is a symbol type followed by the token value for leaves, or by the children's shapes otherwise.
+    The ids are only compared within one tree, so the table is kept per parse instead of growing with every compilation.
+    Returns the index of the first token after the tree, or None if not successful.
+'''
+def _build_tree(tree: Tree, tokens: list[Token], token_types: list[T | None], t_idx: int):
+    stack = []
+    node_type = tree.symbol.type
+    children = tree.nodes
+    nterm_symbols = _NTERM_SYMBOLS
+    expression = N.EXPRESSION
+    id_type = T.ID
+    shapes = {}
+    intern_shape = shapes.setdefault
+
+    # Decide which rule fits by looking up the next 2 token types in the parse table
+    rule = _select_rule(node_type, token_types[t_idx], token_types[t_idx + 1])
+    if rule is None:
+        return None
+    symbols = rule.result or ()
+    i = 0
+
+    while True:
+        if i < len(symbols):
+            rule_sym_type = symbols[i]
+            i += 1
+
             # Add terminal symbol to tree if it matches the rule, increment t_idx
-            if rule_sym_type in T and peek is not None and rule_sym_type == peek.type:
-                tree.nodes.append(Tree(tokens[t_idx]))
+            # Symbol types are told apart by their is_terminal flag, and compared by identity since they're enum members
+            if rule_sym_type.is_terminal:
+                if rule_sym_type is not token_types[t_idx]:
+                    return None
+                peek = tokens[t_idx]
+                leaf = Tree(peek)
+                leaf.shape = intern_shape((rule_sym_type, peek.value), len(shapes))
+                leaf.needs_check = rule_sym_type is id_type
+                children.append(leaf)
                 t_idx += 1
+                continue
 
-            # Recursivly expand non-terminal symbols. Add the expanded node to the tree. Return None if expanding failed
-            elif rule_sym_type in N:
-                nterm_node = Tree(Symbol(rule_sym_type))
-                t_idx = _build_tree(nterm_node, tokens, t_idx)
-                if t_idx == None:
-                    return None
+            # Non-terminal symbols are expanded before the rest of the rule, the node continues once they're finished
+            rule = _select_rule(rule_sym_type, token_types[t_idx], token_types[t_idx + 1])
+            if rule is None:
+                return None
+            # An epsilon rule leaves the node empty, and empty nodes are removed, so it isn't expanded at all.
+            # Every operator level of an expression ends in one, so this skips most non-terminals in an expression
+            if rule.result is None:
+                continue
+            stack.append((node_type, children, symbols, i))
+            node_type = rule_sym_type
+            children = []
+            symbols = rule.result
+            i = 0
+            continue
 
-                # If node has only one child, add that child instead of itself (redundant) (unless it's expression)
-                if len(nterm_node.nodes) == 1 and nterm_node.symbol.type != N.EXPRESSION:
-                    tree.nodes.append(nterm_node.nodes[0])
-                # If node has no children (epsilon), remove it entirely (redundant)
-                elif len(nterm_node.nodes) != 0:
-                    tree.nodes.append(nterm_node)
-
-            else:
-                return None   
-        return t_idx
-    
-def _peek(tokens: list[Token], t_idx: int, peek: int):
-    if len(tokens) <= t_idx + peek:
-        return None
-    else:
-        return tokens[t_idx + peek]
\ No newline at end of file
+        # The node is finished, which finishes the whole tree if it's the one expansion started at
+        if not stack:
+            return t_idx
+        nterm_type = node_type
+        nterm_children = children
+        node_type, children, symbols, i = stack.pop()
+
+        # If node has only one child, add that child instead of itself (redundant) (unless it's expression)
+        if len(nterm_children) == 1 and nterm_type is not expression:
+            children.append(nterm_children[0])
+        # If node has no children, remove it entirely (redundant)
+        elif len(nterm_children) != 0:
+            nterm_node = Tree(nterm_symbols[nterm_type], nterm_children)
+            nterm_node.shape = intern_shape((nterm_type, *[n.shape for n in nterm_children]), len(shapes))
+            nterm_node.needs_check = nterm_type is expression or any(n.needs_check for n in nterm_children)
+            children.append(nterm_node)
\ No newline at end of file
@@ -0,0 +1,154 @@
+; Generated 6502 Assembly Code
+; Processor: 6502
+
+    processor 6502
+    org $0600    ; Start program at $0600
+
+start:
+    LDX #$FF
+    TXS          ; Initialize stack pointer
+
+    ; var a = <expression>
+    ; input() function call
+    JSR input_routine
+    STA $11        ; Store to a
+
+    ; var b = <expression>
+    ; input() function call
+    JSR input_routine
+    STA $10        ; Store to b
+
+    ; var r = <expression>
+    LDA #$00      ; Load literal 0
+    STA $13        ; Store to r
+
+    ; if statement
+    LDA $11        ; Load a
+    CLC
+    SBC #$01        ; Carry set if left > right (left - right - 1)
+    LDA #0
+    BCC AND_E0      ; Left is false, A is already 0
+    LDA $10        ; Load b
+    CMP #$03        ; Carry set if left >= right
+    LDA #0
+    BCS AND_E0      ; Right is false, A is already 0
+    LDA #1          ; Both true
+AND_E0:
+    CMP #0
+    BEQ ENDIF1    ; Skip if false
+
+    ; r = <expression>
+    LDA #$07      ; Load literal 7
+    STA $13        ; Store to r
+
+ENDIF1:
+
+    ; output(<value>)
+    LDA $13        ; Load r
+    JSR output_routine
+
+    ; if statement
+    LDA $11        ; Load a
+    CLC
+    SBC #$01        ; Carry set if left > right (left - right - 1)
+    LDA #0
+    BCC AND_E2      ; Left is false, A is already 0
+    LDA $10        ; Load b
+    CMP #$03        ; Carry set if left >= right
+    LDA #0
+    BCS AND_E2      ; Right is false, A is already 0
+    LDA #1          ; Both true
+AND_E2:
+    CMP #0
+    BEQ ENDIF3    ; Skip if false
+
+    ; r = <expression>
+    LDA #$08      ; Load literal 8
+    STA $13        ; Store to r
+
+ENDIF3:
+
+    ; output(<value>)
+    LDA $13        ; Load r
+    JSR output_routine
+
+    ; var n = <expression>
+    LDA #$00      ; Load literal 0
+    STA $12        ; Store to n
+
+    ; if statement
+    LDA $11        ; Load a
+    BEQ OR_T4       ; Left is true, skip right
+    LDA $10        ; Load b
+    CMP #1          ; Carry set if not equal
+    LDA #0
+    BCS OR_E5       ; Both false, A is already 0
+OR_T4:
+    LDA #1          ; At least one true
+OR_E5:
+    CMP #0
+    BEQ ENDIF6    ; Skip if false
+
+    ; n = <expression>
+    LDA #$01      ; Load literal 1
+    STA $12        ; Store to n
+
+ENDIF6:
+
+    JMP WHILE_C8    ; Test condition first
+WHILE7:
+    ; n = <expression>
+    LDA $12        ; Load n
+    CLC
+    ADC #$01        ; Add
+    STA $12        ; Store to n
+
+    ; a = <expression>
+    LDA $11        ; Load a
+    CLC
+    ADC #$01        ; Add
+    STA $11        ; Store to a
+
+    ; b = <expression>
+    LDA $10        ; Load b
+    CLC
+    ADC #$01        ; Add
+    STA $10        ; Store to b
+
+WHILE_C8:
+    ; while condition
+    LDA $11        ; Load a
+    BEQ OR_T10      ; Left is true, skip right
+    LDA $10        ; Load b
+    CMP #1          ; Carry set if not equal
+    LDA #0
+    BCS OR_E11      ; Both false, A is already 0
+OR_T10:
+    LDA #1          ; At least one true
+OR_E11:
+    CMP #0
+    BNE WHILE7    ; Loop if true
+ENDWHILE9:
+
+    ; output(<value>)
+    LDA $12        ; Load n
+    JSR output_routine
+
+
+    BRK          ; End program
+
+; ==================== I/O Routines ====================
+
+output_routine:
+    ; Output value in A to screen/console
+    ; For 6502, this is system-dependent
+    ; Here we write to memory-mapped I/O at $D012 (example)
+    STA $D012       ; Write to output port
+    RTS
+
+input_routine:
+    ; Read input value into A
+    ; For 6502, this is system-dependent
+    ; Here we read from memory-mapped I/O at $D010 (example)
+    LDA $D010       ; Read from input port
+    RTS
@@ -0,0 +1,956 @@
+; Generated 6502 Assembly Code
+; Processor: 6502
+
+    processor 6502
+    org $0600    ; Start program at $0600
+
+start:
+    LDX #$FF
+    TXS          ; Initialize stack pointer
+
+    ; var a = <expression>
+    ; input() function call
+    JSR input_routine
+    STA $10        ; Store to a
+
+    ; var b = <expression>
+    ; input() function call
+    JSR input_routine
+    STA $11        ; Store to b
+
+    ; var r = <expression>
+    LDA #$00      ; Load literal 0
+    STA $12        ; Store to r
+
+    ; if statement
+    LDA $10        ; Load a
+    CLC
+    SBC #$01        ; Carry set if left > right (left - right - 1)
+    BCS AND_R1      ; Left is true, evaluate right
+    LDA #0          ; Left is false
+    JMP AND_E0   ; Too far to branch
+AND_R1:
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    CLC
+    SBC #$03        ; Carry set if left > right (left - right - 1)
+    LDA #0
+    BCC AND_E0      ; Right is false, A is already 0
+    LDA #1          ; Both true
+AND_E0:
+    CMP #0
+    BEQ ENDIF2    ; Skip if false
+
+    ; r = <expression>
+    LDA #$01      ; Load literal 1
+    STA $12        ; Store to r
+
+ENDIF2:
+
+    ; output(<value>)
+    LDA $12        ; Load r
+    JSR output_routine
+
+    ; r = <expression>
+    LDA #$00      ; Load literal 0
+    STA $12        ; Store to r
+
+    ; if statement
+    LDA $10        ; Load a
+    CLC
+    SBC #$01        ; Carry set if left > right (left - right - 1)
+    BCC OR_R5       ; Left is false, evaluate right
+    JMP OR_T3    ; Left is true, too far to branch
+OR_R5:
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    CLC
+    SBC #$03        ; Carry set if left > right (left - right - 1)
+    LDA #0
+    BCC OR_E4       ; Both false, A is already 0
+OR_T3:
+    LDA #1          ; At least one true
+OR_E4:
+    CMP #0
+    BEQ ENDIF6    ; Skip if false
+
+    ; r = <expression>
+    LDA #$01      ; Load literal 1
+    STA $12        ; Store to r
+
+ENDIF6:
+
+    ; output(<value>)
+    LDA $12        ; Load r
+    JSR output_routine
+
+    ; r = <expression>
+    LDA #$00      ; Load literal 0
+    STA $12        ; Store to r
+
+    ; if statement
+    LDA $10        ; Load a
+    CLC
+    SBC #$01        ; Carry set if left > right (left - right - 1)
+    BCS AND_R7      ; Left is true, evaluate right
+    LDA #0          ; Left is false
+    JMP AND_E8   ; Too far to branch
+AND_R7:
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    TAX             ; Save left operand in X
+    LDA $10        ; Load a
+    EOR $11         ; Bitwise XOR
+    STA $FE         ; Save right operand
+    TXA             ; Restore left operand
+    CLC
+    ADC $FE         ; Add
+    CLC
+    SBC #$03        ; Carry set if left > right (left - right - 1)
+    LDA #0
+    BCC AND_E8      ; Right is false, A is already 0
+    LDA #1          ; Both true
+AND_E8:
+    CMP #0
+    BEQ ENDIF9    ; Skip if false
+
+    ; r = <expression>
+    LDA #$01      ; Load literal 1
+    STA $12        ; Store to r
+
+ENDIF9:
+
+    ; output(<value>)
+    LDA $12        ; Load r
+    JSR output_routine
+
+
+    BRK          ; End program
+
+; ==================== I/O Routines ====================
+
+output_routine:
+    ; Output value in A to screen/console
+    ; For 6502, this is system-dependent
+    ; Here we write to memory-mapped I/O at $D012 (example)
+    STA $D012       ; Write to output port
+    RTS
+
+input_routine:
+    ; Read input value into A
+    ; For 6502, this is system-dependent
+    ; Here we read from memory-mapped I/O at $D010 (example)
+    LDA $D010       ; Read from input port
+    RTS